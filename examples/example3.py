@@ -16,13 +16,17 @@ for side in ["left", "right", "top", "bottom"]:
 
 def post_update(self, i):
     # annotates continents next to bars
-    for ind, (bar, x, y) in enumerate(
-        zip(self.bar_attr.top_cols, self.bar_attr.bar_length, self.bar_attr.bar_rank)
+    for ind, (continent, x, y) in enumerate(
+        zip(
+            self.bar_attr.col_vars["continent"],
+            self.bar_attr.bar_length,
+            self.bar_attr.bar_rank,
+        )
     ):
         self.ax.text(
             x - 0.3,
             y,
-            self.dfr.col_var.loc[bar, "continent"],
+            continent,
             ha="right",
             color="k",
             size=12,
@@ -3,18 +3,27 @@ from typing import Callable, Union
 
 import numpy as np
 import pandas as pd
+from matplotlib.collections import PolyCollection
 from matplotlib.patches import FancyBboxPatch
 
-from pynimate.baseplot import Baseplot
+from pynimate.baseplot import Baseplot, _default_post_update
 from pynimate.datafier import BarDatafier
+from pynimate.texts import attach_artist
+
+
+def _default_bar_annot(val: float) -> float:
+    return np.round(val, 2)
 
 
 class Barhplot(Baseplot):
+    _runtime_attrs = Baseplot._runtime_attrs + ("bar_attr", "new_patches")
+    _frame_keyed_attrs = ("column_colors",)
+
     def __init__(
         self,
         datafier: BarDatafier,
         palettes: list[str] = ["viridis"],
-        post_update: Callable[[__qualname__, int], None] = lambda self, i: None,
+        post_update: Callable[[__qualname__, int], None] = _default_post_update,
         annot_bars: bool = True,
         rounded_edges: bool = False,
         fixed_xlim: bool = True,
@@ -81,7 +90,7 @@ class Barhplot(Baseplot):
         time_format: str,
         ip_freq: str,
         palettes: list[str] = ["viridis"],
-        post_update: Callable[[__qualname__, int], None] = lambda self, i: None,
+        post_update: Callable[[__qualname__, int], None] = _default_post_update,
         annot_bars: bool = True,
         rounded_edges: bool = False,
         fixed_xlim=True,
@@ -144,7 +153,10 @@ class Barhplot(Baseplot):
         Returns
         -------
         SimpleNamespace
-            bar_rank, bar_length, top_cols, column_colors
+            bar_rank, bar_length, top_cols, column_colors (RGBA array), col_index
+            (positions of top_cols in the datafier columns), col_vars (column
+            variables of top_cols) and row_vars (row variables of the frame),
+            see `BaseDatafier.add_var`
         """
 
         bar_rank = self.dfr.df_ranks.iloc[i].values
@@ -152,69 +164,195 @@ class Barhplot(Baseplot):
         bar_rank = bar_rank[top_cols]
         bar_length = self.dfr.data.iloc[i].values[top_cols]
         cols = self.dfr.data.columns[top_cols]
-        colors = [self.column_colors[column] for column in cols]
+        colors = self._column_rgba()[top_cols]
+        col_index = np.flatnonzero(top_cols)
         return SimpleNamespace(
             bar_rank=bar_rank,
             bar_length=bar_length,
             top_cols=cols,
             column_colors=colors,
+            col_index=col_index,
+            col_vars={
+                name: values[col_index] for name, values in self.dfr.col_vars.items()
+            },
+            row_vars={name: values[i] for name, values in self.dfr.row_vars.items()},
         )
 
-    def _get_rounded_eges(
-        self,
-    ) -> None:
-        """Creates bar border properties.
+    def visual_delta(self, i: int, j: int) -> float:
+        """Measures the visible change of the bars from frame i to frame j, see
+        `Baseplot.visual_delta`. It is the largest change of a visible bar, either
+        its rank in bar heights or its length relative to the longest bar.
+
+        Parameters
+        ----------
+        i : int
+            First frame index
+        j : int
+            Second frame index
+
+        Returns
+        -------
+        float
+            The change, 0 if the bars look the same
+        """
+        ranks = self.dfr.df_ranks.iloc[[i, j]].to_numpy(dtype=float)
+        lengths = self.dfr.data.iloc[[i, j]].to_numpy(dtype=float)
+        visible = ((ranks >= 1) & (ranks <= self.dfr.n_bars)).any(axis=0)
+        if not visible.any():
+            return 0.0
+        ranks, lengths = ranks[:, visible], lengths[:, visible]
+        scale = max(np.nanmax(np.abs(lengths)), np.finfo(float).tiny)
+        return float(
+            np.nan_to_num(
+                max(
+                    np.nanmax(np.abs(ranks[1] - ranks[0])),
+                    np.nanmax(np.abs(lengths[1] - lengths[0])) / scale,
+                )
+            )
+        )
+
+    def _restore(self) -> None:
+        super()._restore()
+        self._bar_patches = []
+        self._bar_collection = None
+
+    def init(self) -> None:
+        super().init()
+        self._bar_patches = []
+        self._bar_collection = None
+
+    def _persistent_artists(self) -> list:
+        persistent = list(self._bar_patches)
+        if self._bar_collection is not None:
+            persistent.append(self._bar_collection)
+        return persistent
+
+    def _dynamic_limits(self) -> dict:
+        if self.fixed_xlim:
+            return {}
+        ranks = self.dfr.df_ranks.to_numpy()
+        visible = self.dfr.data.where((ranks >= 1) & (ranks <= self.dfr.n_bars))
+        low = np.minimum(0, visible.min(axis=1).to_numpy())
+        high = np.maximum(0, visible.max(axis=1).to_numpy())
+        # bars start at 0, like ax.barh the axis has no margin there
+        return {"x": (*self._margins(low, high, "x", sticky=0), True)}
+
+    def _bar_bounds(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+        # bar geometry as drawn by ax.barh: xmin, bottom, width and height
+        height = self.barh_props["height"]
+        bar_rank = self.bar_attr.bar_rank
+        left = np.broadcast_to(self.barh_props.get("left", 0), bar_rank.shape)
+        bottom = bar_rank - height / 2
+        if self.barh_props.get("align", "center") == "edge":
+            bottom = bar_rank
+        xmin = np.minimum(left, left + self.bar_attr.bar_length)
+        return xmin, bottom, np.abs(self.bar_attr.bar_length), abs(height)
+
+    def _update_bar_collection(self) -> None:
+        """Updates the bars of the collection backend, a single persistent
+        PolyCollection whose vertices and colors are set from the frame arrays.
+        """
+        xmin, bottom, width, height = self._bar_bounds()
+        xmax, top = xmin + width, bottom + height
+        verts = np.stack(
+            [
+                np.column_stack([xmin, bottom]),
+                np.column_stack([xmin, top]),
+                np.column_stack([xmax, top]),
+                np.column_stack([xmax, bottom]),
+            ],
+            axis=1,
+        )
+        if self._bar_collection is None:
+            props = {
+                k: v
+                for k, v in self.barh_props.items()
+                if k not in ("height", "align", "left", "color")
+            }
+            self._bar_collection = PolyCollection([], **props)
+            self.ax.add_collection(self._bar_collection, autolim=False)
+        else:
+            attach_artist(self.ax, self._bar_collection)
+
+        self._bar_collection.set_verts(verts)
+        self._bar_collection.set_facecolor(self.bar_attr.column_colors)
+        self._bar_collection.sticky_edges.x[:] = np.unique(
+            self.barh_props.get("left", 0)
+        )
+        if len(verts):
+            self.ax.update_datalim(verts.reshape(-1, 2))
+        self.ax.autoscale_view()
+
+    def _get_rounded_eges(self) -> None:
+        """Updates the rounded bars, one persistent FancyBboxPatch per visible bar
+        slot. Only their bounds, colors and zorders change between frames.
         See https://matplotlib.org/3.1.0/api/_as_gen/matplotlib.patches.FancyBboxPatch.html
         """
         border = self.bar_border_props
-        self.new_patches = []
-
-        for patch in reversed(self.ax.patches):
-            bb = patch.get_bbox()
-            color = patch.get_facecolor()
-            zorder = patch.zorder
-            p_bbox = FancyBboxPatch(
-                (bb.xmin, bb.ymin),
-                abs(bb.width),
-                abs(bb.height),
-                boxstyle=f"round,pad={border['pad']}"
-                + (
-                    f",rounding_size={border['radius']}"
-                    if border["radius"] != None
-                    else ""
-                ),
-                ec=border["edge_color"],
-                fc=color,
-                mutation_aspect=border["mutation_aspect"],
-                zorder=zorder,
-                **border["kwargs"],
+        xmin, bottom, width, height = self._bar_bounds()
+
+        for _ in range(len(self._bar_patches), len(xmin)):
+            self._bar_patches.append(
+                FancyBboxPatch(
+                    (0, 0),
+                    0,
+                    0,
+                    boxstyle=f"round,pad={border['pad']}"
+                    + (
+                        f",rounding_size={border['radius']}"
+                        if border["radius"] != None
+                        else ""
+                    ),
+                    ec=border["edge_color"],
+                    mutation_aspect=border["mutation_aspect"],
+                    **border["kwargs"],
+                )
             )
-            patch.remove()
-            self.new_patches.append(p_bbox)
+        self.new_patches = self._bar_patches[: len(xmin)]
+        for ind, patch in enumerate(self.new_patches):
+            patch.set_bounds(xmin[ind], bottom[ind], width[ind], height)
+            patch.set_facecolor(self.bar_attr.column_colors[ind])
+            patch.set_zorder(ind)
 
-    def set_barh(self, bar_height: float = 0.86, **kwargs):
+    def set_barh(self, bar_height: float = 0.86, backend: str = "patches", **kwargs):
         """Sets barh properties, addition kwargs are passed to `ax.barh(**kwargs)`
 
+        The "collection" backend draws every bar as part of a single persistent
+        PolyCollection and every bar annotation through one batched text artist,
+        which keeps the frame cost low for large `n_bars`. Additional kwargs are then
+        passed to `PolyCollection(**kwargs)`. Bars drawn by the collection share
+        one zorder, below the annotations. Rounded edges always use one patch per bar.
+
         Parameters
         ----------
         bar_height : float, optional
             Height of the bars (Note this is horizontal barplot), by default 0.86
+        backend : str, optional
+            Bar rendering backend, "patches" or "collection", by default "patches"
         """
+        assert backend in (
+            "patches",
+            "collection",
+        ), f"Unknown backend {backend}, use 'patches' or 'collection'"
         self.barh_props = {"height": bar_height, **kwargs}
+        self.bar_backend = backend
 
     def set_bar_annots(
         self,
-        text_callback: Callable[[float], Union[str, float]] = lambda val: np.round(
-            val, 2
-        ),
+        text_callback: Callable[[float], Union[str, float]] = _default_bar_annot,
         xoffset: float = 0.1,
         yoffset: float = -0.1,
         ha: str = "left",
+        batch: bool = False,
         **kwargs,
     ) -> None:
         """Sets bar annotation properties, additional kwargs are passed to `ax.text(**kwargs)`.
         (Note these annotations are the texts near the bars)
 
+        With `batch=True` the callback formats every bar of a frame at once, it
+        receives the array of bar lengths and returns a sequence of texts, ie.
+        `pynimate.utils.human_readable_array`. The texts of each frame are cached.
+
         Parameters
         ----------
         text_callback : Callable[[float], Union[str, float]], optional
@@ -225,14 +363,18 @@ class Barhplot(Baseplot):
              Y offset relative to bar height, by default -0.1
         ha : str, optional
             Horizontal alignment, by default "left"
+        batch : bool, optional
+            Calls the callback once per frame with an array, by default False
         """
         self.bar_annot_props = {
             "callback": text_callback,
             "xoffset": xoffset,
             "yoffset": yoffset,
             "ha": ha,
+            "batch": batch,
             "kwargs": kwargs,
         }
+        self._label_cache.pop("bar_annots", None)
 
     def set_bar_border_props(
         self,
@@ -264,33 +406,86 @@ class Barhplot(Baseplot):
             "kwargs": kwargs,
         }
 
-    def update(self, i: int) -> None:
-        """FuncAnimation update
+    def _dynamic_axes(self) -> list:
+        # bar labels are yticks, they change with the ranking in every frame
+        return [self.ax.yaxis] + ([] if self.fixed_xlim else [self.ax.xaxis])
+
+    def get_frame(self, i: int) -> SimpleNamespace:
+        """Prepares the drawing inputs of the ith frame, see `Baseplot.get_frame`.
+        Adds the bar attributes and the bar annotation texts.
 
         Parameters
         ----------
         i : int
-            Animation frame
+            Animation frame index
+
+        Returns
+        -------
+        SimpleNamespace
+            i, texts, bar_attr, bar_annots
         """
-        self.ax.clear()
+        frame = super().get_frame(i)
+        frame.bar_attr = self.get_ith_bar_attrs(i)
+        frame.bar_annots = (
+            self._frame_labels(
+                "bar_annots", i, lambda: self._format_bar_annots(frame.bar_attr)
+            )
+            if self.annot_bars
+            else []
+        )
+        return frame
 
-        self.bar_attr = self.get_ith_bar_attrs(i)
+    def _format_bar_annots(self, bar_attr: SimpleNamespace) -> list:
+        callback = self.bar_annot_props["callback"]
+        if self.bar_annot_props["batch"]:
+            return list(callback(np.asarray(bar_attr.bar_length)))
+        return [callback(x) for x in bar_attr.bar_length]
 
-        self.ax.barh(
-            self.bar_attr.bar_rank,
-            self.bar_attr.bar_length,
-            tick_label=self.bar_attr.top_cols,
-            color=self.bar_attr.column_colors,
-            **self.barh_props,
-        )
-        if self.annot_bars:
-            for ind, (x, y) in enumerate(
-                zip(self.bar_attr.bar_length, self.bar_attr.bar_rank)
+    def update(self, i: int, frame: SimpleNamespace = None) -> None:
+        """FuncAnimation update
+
+        Parameters
+        ----------
+        i : int
+            Animation frame
+        frame : SimpleNamespace, optional
+            Drawing inputs prepared by `get_frame(i)`, by default None
+        """
+        if frame is None:
+            frame = self.get_frame(i)
+        self._clear_frame()
+
+        self.bar_attr = frame.bar_attr
+
+        collection = self.bar_backend == "collection"
+        if self.rounded_edges or collection:
+            self.ax.set_yticks(self.bar_attr.bar_rank, labels=self.bar_attr.top_cols)
+        else:
+            self.ax.barh(
+                self.bar_attr.bar_rank,
+                self.bar_attr.bar_length,
+                tick_label=self.bar_attr.top_cols,
+                color=self.bar_attr.column_colors,
+                **self.barh_props,
+            )
+        if self.annot_bars and collection:
+            self._text_pool.batch(
+                "bar_annots",
+                self.bar_attr.bar_length + self.bar_annot_props["xoffset"],
+                self.bar_attr.bar_rank + self.bar_annot_props["yoffset"],
+                frame.bar_annots,
+                ha=self.bar_annot_props["ha"],
+                **self.bar_annot_props["kwargs"],
+            )
+        elif self.annot_bars:
+            for ind, (x, y, text) in enumerate(
+                zip(self.bar_attr.bar_length, self.bar_attr.bar_rank, frame.bar_annots)
             ):
-                self.ax.text(
+                self._text_pool.text(
+                    ("bar_annot", ind),
                     x + self.bar_annot_props["xoffset"],
                     y + self.bar_annot_props["yoffset"],
-                    self.bar_annot_props["callback"](x),
+                    text,
                     ha=self.bar_annot_props["ha"],
                     **self.bar_annot_props["kwargs"],
                     zorder=ind,
@@ -298,10 +493,14 @@ class Barhplot(Baseplot):
 
         if self.rounded_edges:
             self._get_rounded_eges()
-            for patch in self.new_patches[::-1]:
+            for patch in self.new_patches:
+                # new and detached patches alike
                 self.ax.add_patch(patch)
-
-        for ind, patch in enumerate(self.ax.patches):
-            patch.set_zorder(ind)
-
-        super().update(i)
+            self.ax.relim()
+        elif collection:
+            self._update_bar_collection()
+        else:
+            for ind, patch in enumerate(self.ax.patches):
+                patch.set_zorder(ind)
+
+        super().update(i, frame)
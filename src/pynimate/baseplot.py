@@ -1,19 +1,47 @@
+from collections import OrderedDict
+from types import SimpleNamespace
 from typing import Callable, Union
 
+import matplotlib.colors as mcolors
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import seaborn as sns
 
 from pynimate.datafier import BaseDatafier
+from pynimate.shared import SharedDatafier
+from pynimate.spec import PlotSpec, plot_state
+from pynimate.texts import TextPool, detach_artists
+from pynimate.utils import nice_steps, smooth_limits
+
+# frames whose formatted labels are kept by `Baseplot._frame_labels`
+_LABEL_CACHE_FRAMES = 256
+
+
+def _default_post_update(self, i: int) -> None:
+    return None
+
+
+def _default_time_callback(i: int, datafier: BaseDatafier) -> str:
+    return datafier.data.index[i]
+
+
+def _default_time_labels(index: pd.DatetimeIndex) -> list[str]:
+    return [str(time) for time in index]
 
 
 class Baseplot:
+    # attributes holding matplotlib state or values derived from the datafier,
+    # these are left out of the plot spec
+    _runtime_attrs = ("ax", "time_range")
+    # decorations already resolved into the output of get_frame
+    _frame_keyed_attrs = ()
+
     def __init__(
         self,
         datafier: BaseDatafier,
         palettes: list[str] = ["viridis"],
-        post_update: Callable[[__qualname__, int], None] = lambda self, i: None,
+        post_update: Callable[[__qualname__, int], None] = _default_post_update,
         fixed_xlim=True,
         fixed_ylim=True,
         xticks=True,
@@ -62,13 +90,14 @@ class Baseplot:
         """
         self.datafier = self.dfr = datafier
 
-        self.time_range = list(self.datafier.data.index)
+        self._restore()
         self.length = len(self.time_range)
 
         self.palettes = palettes
         self.column_colors = self.generate_column_colors()
 
         self.text_collection = {}
+        self.batch_texts = set()
         self.post_update = post_update
         self.fixed_xlim = fixed_xlim
         self.fixed_ylim = fixed_ylim
@@ -79,6 +108,7 @@ class Baseplot:
         self.set_xticks()
         self.set_yticks()
         self.set_grid()
+        self.lim_schedule = None
 
     @classmethod
     def from_df(
@@ -87,7 +117,7 @@ class Baseplot:
         time_format: str,
         ip_freq: str,
         palettes: list[str] = ["viridis"],
-        post_update: Callable[[__qualname__, int], None] = lambda self, i: None,
+        post_update: Callable[[__qualname__, int], None] = _default_post_update,
         fixed_xlim=True,
         fixed_ylim=True,
         xticks=True,
@@ -105,6 +135,33 @@ class Baseplot:
             grid,
         )
 
+    def _restore(self) -> None:
+        """Recreates the attributes derived from the datafier and the runtime state"""
+        self.time_range = list(self.datafier.data.index)
+        self._static_artists = None
+        self._text_pool = None
+        self._layered = False
+        self._schedule = None
+        self._label_cache = {}
+        self._rgba = None
+
+    def to_spec(self, shared: SharedDatafier = None) -> PlotSpec:
+        """Creates a picklable spec of this plot, see `pynimate.spec.PlotSpec`.
+        Callbacks must be importable module level functions.
+
+        Parameters
+        ----------
+        shared : SharedDatafier, optional
+            Shared memory handle of the datafier (see `BaseDatafier.export_shared`),
+            shipped instead of the datafier, by default None
+
+        Returns
+        -------
+        PlotSpec
+            The plot spec
+        """
+        return PlotSpec.from_plot(self, shared)
+
     def generate_column_colors(self) -> dict[str, str]:
         """Generates column colors based on the given color palettes.
 
@@ -173,6 +230,23 @@ class Baseplot:
             Single color str or list of colors or dict of column to color mapping
         """
         self.column_colors = self.set_column_decorations(colors, self.column_colors)
+        self._rgba = None
+
+    def _column_rgba(self) -> np.ndarray:
+        """Column colors as RGBA rows aligned with the datafier columns, converted
+        once, so frames gather their colors by column position. Columns without
+        a color are transparent.
+        """
+        if self._rgba is None:
+            columns = self.dfr.data.columns
+            rgba = np.zeros((len(columns), 4))
+            colored = [n for n, col in enumerate(columns) if col in self.column_colors]
+            if colored:
+                rgba[colored] = mcolors.to_rgba_array(
+                    [self.column_colors[columns[n]] for n in colored]
+                )
+            self._rgba = rgba
+        return self._rgba
 
     # def set_column_colors(self, colors: Union[str, list[str], dict[str, str]]) -> None:
     #     """Sets column colors. If colors is a list, length of colors should be equal
@@ -234,6 +308,83 @@ class Baseplot:
             ylim = [None, self.total_max]
         self.ylim = ylim
 
+    def set_lim_schedule(
+        self, smoothing: int = 0, nice_ticks: bool = True, n_ticks: int = 6
+    ) -> None:
+        """Precomputes the limits of the axes that are not fixed (see `fixed_xlim`
+        and `fixed_ylim`) for every frame, instead of autoscaling in every frame.
+        The limits follow the data with matplotlib's default margins, they can be
+        smoothed and the ticks of numeric axes snapped to nice numbers.
+
+        Parameters
+        ----------
+        smoothing : int, optional
+            Smoothing window in frames, see `pynimate.utils.smooth_limits`,
+            by default 0
+        nice_ticks : bool, optional
+            Places the ticks of numeric axes at multiples of nice steps,
+            see `pynimate.utils.nice_steps`, by default True
+        n_ticks : int, optional
+            Approximate number of ticks, by default 6
+        """
+        self.lim_schedule = {
+            "smoothing": smoothing,
+            "nice_ticks": nice_ticks,
+            "n_ticks": n_ticks,
+        }
+        self._schedule = None
+
+    def _frame_labels(self, name: str, i: int, compute: Callable[[], list]) -> list:
+        # formatted labels of the ith frame, reused when one of the recently drawn
+        # frames is drawn again, ie. by dedupe or threshold sampling
+        cache = self._label_cache.setdefault(name, OrderedDict())
+        labels = cache.get(i)
+        if labels is None:
+            labels = cache[i] = compute()
+            if len(cache) > _LABEL_CACHE_FRAMES:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(i)
+        return labels
+
+    def _dynamic_limits(self) -> dict:
+        # per-frame data limits of the dynamic axes, {"x"|"y": (low, high, numeric)}
+        return {}
+
+    def _get_schedule(self) -> dict:
+        if self._schedule is None:
+            self._schedule = {}
+            props = self.lim_schedule
+            for axis, (low, high, numeric) in self._dynamic_limits().items():
+                low, high = smooth_limits(low, high, props["smoothing"])
+                steps = (
+                    nice_steps(high - low, props["n_ticks"])
+                    if props["nice_ticks"] and numeric
+                    else None
+                )
+                self._schedule[axis] = SimpleNamespace(low=low, high=high, steps=steps)
+        return self._schedule
+
+    def _apply_schedule(self, i: int) -> None:
+        for axis, schedule in self._get_schedule().items():
+            low, high = schedule.low[i], schedule.high[i]
+            if not (np.isfinite(low) and np.isfinite(high)) or low == high:
+                continue
+            set_lim = self.ax.set_xlim if axis == "x" else self.ax.set_ylim
+            set_lim(low, high)
+            if schedule.steps is not None:
+                step = schedule.steps[i]
+                ticks = np.arange(np.ceil(low / step) * step, high + step * 1e-6, step)
+                (self.ax.set_xticks if axis == "x" else self.ax.set_yticks)(ticks)
+
+    def _margins(
+        self, low: np.ndarray, high: np.ndarray, axis: str, sticky: float = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # adds the axes margins, limits equal to `sticky` stay in place
+        margin = self.ax.margins()[0 if axis == "x" else 1] * (high - low)
+        low = np.where(low == sticky, low, low - margin)
+        return low, high + margin
+
     def set_axes(self, ax: plt.Axes) -> None:
         """Sets the Axes of this plot
 
@@ -243,6 +394,7 @@ class Baseplot:
             Axes of this plot
         """
         self.ax = ax
+        self._static_artists = None
 
     def set_title(
         self,
@@ -322,22 +474,29 @@ class Baseplot:
 
     def set_time(
         self,
-        callback: Callable[
-            [int, BaseDatafier], str
-        ] = lambda i, datafier: datafier.data.index[i],
+        callback: Union[
+            Callable[[int, BaseDatafier], str], str
+        ] = _default_time_callback,
         x: float = 0.97,
         y: float = 0.27,
         size: float = 46,
         weight: float = 800,
         ha="right",
         color: str = "#777777",
+        batch: bool = False,
         **kwargs,
     ) -> None:
         """Annotates the time in the plot and additional kwargs are passed to `plt.text(**kwargs)`
 
+        With `batch=True` the callback receives the whole time index
+        (`datafier.data.index`) and returns one label per frame, ie.
+        `lambda index: index.year`. A strftime pattern, ie. "%Y", can be passed
+        instead of a callback. The labels are then computed once for the whole
+        animation.
+
         Parameters
         ----------
-        callback : Callable[ [int, BaseDatafier], str ], optional
+        callback : Union[Callable[[int, BaseDatafier], str], str], optional
             Callback function to customize the time text, by default `lambda i, datafier: datafier.data.index[i]`
         x : float, optional
             x coordinate of the text, by default 0.97
@@ -351,6 +510,8 @@ class Baseplot:
             horizontal alignment, by default "right"
         color : str, optional
             text color, by default "#777777"
+        batch : bool, optional
+            Calls the callback once with the time index, by default False
 
         callback args:
         ```
@@ -359,6 +520,10 @@ class Baseplot:
                 access the data using datafier.data
         ```
         """
+        if callback is _default_time_callback:
+            # same texts, formatted once
+            callback, batch = _default_time_labels, True
+        self._set_batch_text("time", callback, batch)
         self.text_collection["time"] = (
             callback,
             {
@@ -378,14 +543,16 @@ class Baseplot:
         self,
         key: str,
         text: str = None,
-        callback: Callable[[int, BaseDatafier], str] = None,
+        callback: Union[Callable[[int, BaseDatafier], str], str] = None,
         x: float = 0,
         y: str = 0,
         size: float = 13,
         color: str = "#777777",
+        batch: bool = False,
         **kwargs,
     ):
         """General function to add custom texts in the plot. Either text or callback should be passd but not both.
+        The callback can be batched or a strftime pattern, see `set_time`.
 
         Parameters
         ----------
@@ -404,6 +571,8 @@ class Baseplot:
             Text size, by default 13
         color : str, optional
             Text color, by default "#777777"
+        batch : bool, optional
+            Calls the callback once with the time index, by default False
 
         Callback args:
         ```
@@ -416,6 +585,7 @@ class Baseplot:
         ```
         """
         assert text or callback, "Both text and callback cannot be None"
+        self._set_batch_text(key, callback, batch)
         self.text_collection[key] = (
             callback,
             {
@@ -446,6 +616,26 @@ class Baseplot:
         print(self.text_collection)
         for key in keys:
             self.text_collection.pop(key)
+            self._set_batch_text(key, None, False)
+
+    def _set_batch_text(self, key: str, callback, batch: bool) -> None:
+        self._label_cache.pop(("text", key), None)
+        if batch or isinstance(callback, str):
+            self.batch_texts.add(key)
+        else:
+            self.batch_texts.discard(key)
+
+    def _text_labels(self, key: str, callback) -> list:
+        # labels of every frame for batched texts, computed once
+        labels = self._label_cache.get(("text", key))
+        if labels is None:
+            index = self.datafier.data.index
+            if isinstance(callback, str):
+                labels = index.strftime(callback)
+            else:
+                labels = callback(index)
+            labels = self._label_cache[("text", key)] = [str(s) for s in labels]
+        return labels
 
     def set_xticks(
         self, axis: str = "x", colors: str = "#777777", labelsize: float = 12, **kwargs
@@ -518,7 +708,114 @@ class Baseplot:
             **kwargs,
         }
 
-    def update(self, i):
+    def get_frame(self, i: int) -> SimpleNamespace:
+        """Prepares the drawing inputs of the ith frame without touching the Axes,
+        so it can run ahead of drawing (ie. on another thread).
+        Baseplot prepares the texts returned by the text callbacks.
+
+        Parameters
+        ----------
+        i : int
+            Animation frame index
+
+        Returns
+        -------
+        SimpleNamespace
+            i, texts (dict of text key to callback output)
+        """
+        return SimpleNamespace(i=i, texts=self.frame_texts(i))
+
+    def frame_texts(self, i: int) -> dict:
+        """Returns the texts of the ith frame returned by the text callbacks
+
+        Parameters
+        ----------
+        i : int
+            Animation frame index
+
+        Returns
+        -------
+        dict
+            Text key to callback output mapping
+        """
+        return {
+            key: self._text_labels(key, callback)[i]
+            if key in self.batch_texts
+            else callback(i, self.datafier)
+            for key, (callback, _) in self.text_collection.items()
+            if callback
+        }
+
+    def visual_delta(self, i: int, j: int) -> float:
+        """Measures how much the plot visibly changes from frame i to frame j, as a
+        fraction of the plot scale (see `Canvas.sample_frames`). Texts are compared
+        separately. Baseplot does not know what its subclasses draw, so every
+        change is significant.
+
+        Parameters
+        ----------
+        i : int
+            First frame index
+        j : int
+            Second frame index
+
+        Returns
+        -------
+        float
+            The change, 0 if the frames look the same
+        """
+        return 0.0 if i == j else np.inf
+
+    def style(self) -> dict:
+        """Returns the plot configuration that affects every frame, ie. the plot
+        attributes except the matplotlib state and the decorations already
+        resolved by `get_frame`.
+
+        Returns
+        -------
+        dict
+            Attribute name to value mapping
+        """
+        return {
+            k: v
+            for k, v in plot_state(self).items()
+            if k not in self._frame_keyed_attrs
+        }
+
+    def frame_inputs(self, frame: SimpleNamespace) -> dict:
+        """Returns the per-frame drawing inputs of a prepared frame. The frame index
+        is only an input if a custom post_update (which receives it) is set.
+
+        Parameters
+        ----------
+        frame : SimpleNamespace
+            Output of `get_frame`
+
+        Returns
+        -------
+        dict
+            The drawing inputs
+        """
+        inputs = dict(vars(frame))
+        if self.lim_schedule is not None:
+            # smoothed limits look ahead, they are not derived from the frame data
+            inputs["limits"] = [
+                (schedule.low[frame.i], schedule.high[frame.i])
+                for schedule in self._get_schedule().values()
+            ]
+        if self.post_update is _default_post_update:
+            inputs.pop("i")
+        return inputs
+
+    def init(self) -> None:
+        """Sets up the static layer of the plot: axis limits, tick properties, grid
+        and the texts without callbacks. These do not change between frames, so
+        they are applied once before the animation starts instead of every frame.
+        """
+        self._remove_frame_artists(keep_static=False)
+        self._text_pool = TextPool(self.ax)
+        # decorations may have been edited in place since the last animation
+        self._rgba = None
         if self.fixed_xlim:
             self.ax.set_xlim(self.xlim)
         if self.fixed_ylim:
@@ -534,17 +831,146 @@ class Baseplot:
 
         self.ax.set_axisbelow(self.grid_behind)
 
+        self._static_artists = [
+            self.ax.text(**props_dict, transform=self.ax.transAxes)
+            for callback, props_dict in self.text_collection.values()
+            if not callback
+        ]
+
+    def _frame_artists(self) -> list:
+        ax = self.ax
+        artists = [*ax.collections, *ax.patches, *ax.lines, *ax.texts, *ax.images]
+        artists.extend(ax.artists)
+        if ax.legend_ is not None:
+            artists.append(ax.legend_)
+        return artists
+
+    def _remove_frame_artists(self, keep_static: bool = True) -> None:
+        kept = set()
+        if keep_static:
+            kept.update(map(id, self._static_artists))
+            kept.update(map(id, self._pooled_artists()))
+        for artist in self._frame_artists():
+            if id(artist) not in kept:
+                artist.remove()
+        self.ax.containers.clear()
+        self.ax.relim()
+
+    def _persistent_artists(self) -> list:
+        # artists reused across frames besides the pooled texts, `_clear_frame`
+        # detaches them and the frame attaches again the ones it uses
+        return []
+
+    def _pooled_artists(self) -> list:
+        return list(self._text_pool.artists.values()) + self._persistent_artists()
+
+    def _clear_frame(self) -> None:
+        """Removes the artists of the previous frame, keeping the static layer
+        and the pooled texts"""
+        if self._static_artists is None:
+            self.init()
+        else:
+            self._remove_frame_artists()
+        self._text_pool.begin()
+        detach_artists(self.ax, self._persistent_artists())
+
+    def _dynamic_axes(self) -> list:
+        axes = []
+        if not self.fixed_xlim:
+            axes.append(self.ax.xaxis)
+        if not self.fixed_ylim:
+            axes.append(self.ax.yaxis)
+        return axes
+
+    def dynamic_artists(self) -> list:
+        """Returns the artists redrawn every frame: the axis whose limits change,
+        every artist except the static texts, and the static artists drawn above
+        them (ie. spines over the bars), so the layers compose as a full draw.
+
+        Returns
+        -------
+        list
+            Dynamic artists in drawing order
+        """
+        ax = self.ax
+        static = set(map(id, self._static_artists or []))
+        dynamic = set(map(id, self._dynamic_axes()))
+        dynamic.update(
+            id(artist) for artist in self._frame_artists() if id(artist) not in static
+        )
+        # the artists of `Axes.draw`, in the same order
+        hidden = {id(ax.patch)}
+        if not (ax.axison and ax.get_frame_on()):
+            hidden.update(map(id, ax.spines.values()))
+        if not ax.axison:
+            hidden.update((id(ax.xaxis), id(ax.yaxis)))
+        artists = sorted(
+            (artist for artist in ax.get_children() if id(artist) not in hidden),
+            key=lambda artist: artist.get_zorder(),
+        )
+        first = next(
+            (n for n, artist in enumerate(artists) if id(artist) in dynamic),
+            len(artists),
+        )
+        return artists[first:]
+
+    def set_layered(self, layered: bool) -> None:
+        """Enables layered drawing, where the dynamic artists are excluded from
+        full figure draws (which then only render the static layer) and drawn
+        on top of it by `draw_dynamic`. Used by `Canvas(layered=True)`, which
+        captures the static layer once, so `post_update` changes to static artists
+        after the first frame are not drawn.
+
+        Parameters
+        ----------
+        layered : bool
+            Enables or disables layered drawing
+        """
+        self._layered = layered
+        for artist in self.dynamic_artists():
+            artist.set_animated(layered)
+
+    def draw_dynamic(self, renderer) -> None:
+        """Draws the dynamic layer on top of the canvas
+
+        Parameters
+        ----------
+        renderer : RendererBase
+            The figure renderer
+        """
+        self.ax.autoscale_view()
+        for artist in self.dynamic_artists():
+            artist.draw(renderer)
+
+    def update(self, i: int, frame: SimpleNamespace = None) -> None:
+        """FuncAnimation update
+
+        Parameters
+        ----------
+        i : int
+            Animation frame
+        frame : SimpleNamespace, optional
+            Drawing inputs prepared by `get_frame(i)`, by default None
+        """
+        if frame is None:
+            frame = self.get_frame(i)
+        if self._static_artists is None:
+            self.init()
+
+        if self.lim_schedule is not None:
+            self._apply_schedule(i)
         self.post_update(self, i)
-        for v in self.text_collection.values():
-            callback, props_dict = v[0], v[1]
+        for key, (callback, props_dict) in self.text_collection.items():
             if callback:
-                self.ax.text(
-                    s=callback(i, self.datafier),
-                    transform=self.ax.transAxes,
-                    **props_dict,
-                )
-            else:
-                self.ax.text(
-                    **props_dict,
+                props = {k: v for k, v in props_dict.items() if k not in ("x", "y")}
+                self._text_pool.text(
+                    key,
+                    props_dict["x"],
+                    props_dict["y"],
+                    frame.texts[key],
                     transform=self.ax.transAxes,
+                    **props,
                 )
+        if self._layered:
+            for artist in self.dynamic_artists():
+                artist.set_animated(True)
@@ -0,0 +1,126 @@
+import io
+import os
+import zlib
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import numpy as np
+
+
+class FrameCache:
+    def __init__(self, directory: str, max_bytes: int = 2**30) -> None:
+        """On-disk cache of rendered RGBA frames, addressed by a hash of each frame's
+        drawing inputs (see `Canvas.save(cache=...)`). Frames are stored zlib
+        compressed, the least recently used frames are evicted once the cache
+        exceeds `max_bytes`. The cache survives between runs, so re-rendering after
+        a small edit only draws the frames whose inputs changed.
+
+        Parameters
+        ----------
+        directory : str
+            Cache directory
+        max_bytes : int, optional
+            Maximum size of the cache on disk, by default 1 GiB
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+        entries = [
+            entry
+            for entry in os.scandir(directory)
+            if entry.is_file() and entry.name.endswith(".frame")
+        ]
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        self._entries = OrderedDict(
+            (entry.name[: -len(".frame")], entry.stat().st_size) for entry in entries
+        )
+        self.size = sum(self._entries.values())
+        self._evict()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.frame")
+
+    def get(self, key: str) -> np.ndarray:
+        """Returns the cached frame of `key`, or None on a miss
+
+        Parameters
+        ----------
+        key : str
+            Frame key
+
+        Returns
+        -------
+        np.ndarray
+            The RGBA frame or None
+        """
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                frame = np.load(io.BytesIO(zlib.decompress(f.read())))
+        except (OSError, ValueError, zlib.error):
+            self._remove(key)
+            self.misses += 1
+            return None
+        os.utime(self._path(key))
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return frame
+
+    def put(self, key: str, frame: np.ndarray) -> None:
+        """Stores a frame, evicting the least recently used frames if needed
+
+        Parameters
+        ----------
+        key : str
+            Frame key
+        frame : np.ndarray
+            RGBA frame
+        """
+        buf = io.BytesIO()
+        np.save(buf, np.ascontiguousarray(frame))
+        data = zlib.compress(buf.getvalue(), 1)
+        tmp_path = f"{self._path(key)}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+
+        self.size += len(data) - self._entries.pop(key, 0)
+        self._entries[key] = len(data)
+        self._evict()
+
+    def _remove(self, key: str) -> None:
+        self.size -= self._entries.pop(key)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        while self.size > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Removes every cached frame"""
+        for key in list(self._entries):
+            self._remove(key)
+
+    @property
+    def stats(self) -> SimpleNamespace:
+        """Cache statistics: hits, misses, hit_rate, evictions, entries and size in bytes"""
+        lookups = self.hits + self.misses
+        return SimpleNamespace(
+            hits=self.hits,
+            misses=self.misses,
+            hit_rate=self.hits / lookups if lookups else 0.0,
+            evictions=self.evictions,
+            entries=len(self._entries),
+            size=self.size,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
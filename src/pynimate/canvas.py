@@ -1,9 +1,40 @@
-from typing import Callable
+import hashlib
+import os
+import shutil
+import time
+import warnings
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Callable, Iterable, Iterator
 
+import matplotlib as mpl
 import matplotlib.animation as animation
 import matplotlib.pyplot as plt
 import numpy as np
 
+from pynimate.cache import FrameCache
+from pynimate.pipeline import run_pipeline
+from pynimate.segments import SegmentManifest, concat
+from pynimate.spec import config_hash
+from pynimate.writers import (
+    IMAGE_EXTENSIONS,
+    ContactSheetWriter,
+    MultiFrameWriter,
+    PosterWriter,
+    get_writer,
+)
+
+# rcParams that do not change the rendered pixels
+_IGNORED_PARAMS = ("animation.", "backend", "interactive", "keymap.", "savefig.")
+
+
+def _style_params() -> dict:
+    return {
+        k: repr(v)
+        for k, v in mpl.rcParams.items()
+        if not k.startswith(_IGNORED_PARAMS)
+    }
+
 
 class Canvas:
     def __init__(
@@ -12,6 +43,7 @@ class Canvas:
         ncols: int = 1,
         figsize: tuple[int, int] = (12.8, 7.2),
         post_update: Callable[[plt.Figure, list[list[plt.Axes]]], None] = None,
+        layered: bool = False,
         **kwargs,
     ) -> None:
         """Creates the matplotlib figure, subplots and additional figure properties.
@@ -27,6 +59,13 @@ class Canvas:
             Width, height in inches, by default (16, 9)
         post_update : Callable[[plt.Figure, list[list[plt.Axes]]], None], optional
             callback function for additional figure customization, by default None
+        layered : bool, optional
+            Draws the static layer of the plots (spines, fixed axes, grid, texts
+            without callbacks) once and only redraws the dynamic artists on top of it
+            in saves that use a frame writer (see `save`), by default False.
+            The static layer is captured after the first frame, so later changes
+            that the canvas or plot `post_update` callbacks make to static artists
+            (ie. titles, spines or the axes facecolor) are dropped in this mode.
 
         post_update args:
         ```
@@ -43,6 +82,11 @@ class Canvas:
             self.ax = np.array([self.ax])
         self.plots = []
         self.length = 0
+        self.frames = None
+        self.layered = layered
+        self._background = None
+        self.frame_cache_size = 32
+        self.clear_frame_cache()
 
     def add_plot(self, plot, index: tuple[int, int] = (0, 0)) -> __qualname__:
         """Adds the plot to be animated with its ax index (for multiple subplots)
@@ -64,14 +108,19 @@ class Canvas:
         self.plots.append(plot)
         return self
 
-    # def _init(self) -> None:
-    #     for plot in self.plots:
-    #         plot.init()
+    def _init(self) -> None:
+        for plot in self.plots:
+            plot.init()
+
+    def _get_frame(self, i: int) -> list:
+        return [plot.get_frame(min(plot.length - 1, i)) for plot in self.plots]
 
-    def _update(self, i: int) -> None:
+    def _update(self, i: int, frames: list = None) -> None:
         self.post_update(self.fig, self.ax)
-        for plot in self.plots:
-            plot.update(min(plot.length - 1, i))
+        for n, plot in enumerate(self.plots):
+            plot.update(
+                min(plot.length - 1, i), None if frames is None else frames[n]
+            )
 
     def animate(
         self,
@@ -89,18 +138,71 @@ class Canvas:
             Interval between each frame. Defaults to 50ms, by default 50
 
         """
+        self.frames = frames_callback(self.length)
+        self.clear_frame_cache()
         self.ani = animation.FuncAnimation(
             self.fig,
             self._update,
-            frames=frames_callback(self.length),
+            frames=self.frames,
             interval=interval,
+            init_func=self._init,
             blit=False,
             **kwargs,
         )
         return self.ani
 
-    def save(self, filename: str, fps: int, extension: str = "gif", **kwargs):
-        """Saves the current animation
+    def save(
+        self,
+        filename: str,
+        fps: int,
+        extension: str = "gif",
+        pipelined: bool = False,
+        queue_size: int = 8,
+        resumable: bool = False,
+        segment_frames: int = 1000,
+        cache: FrameCache = None,
+        dedupe: bool = False,
+        threshold: float = None,
+        **kwargs,
+    ):
+        """Saves the current animation. By default additional kwargs are passed to
+        `animation.FuncAnimation.save(**kwargs)`.
+
+        With `pipelined=True` the frames are rendered by three stages connected by
+        bounded queues: a prefetching thread prepares the frame data, the calling
+        thread draws and an encoder thread feeds the frame writer (see `render_range`
+        for the supported extensions). Additional kwargs are then passed to the
+        frame writer.
+
+        With `resumable=True` the animation is written in segments of `segment_frames`
+        frames to the directory `{filename}.segments`, together with a progress
+        journal. If the save is interrupted, saving again with the same configuration
+        keeps the completed segments and continues from the first missing frame.
+        The journal is discarded if the plots, canvas or fps changed. Once every
+        segment is written they are stitched into the output and the directory is
+        removed. Additional kwargs are passed to the frame writer.
+
+        With a `cache` (see `pynimate.cache.FrameCache`), every frame is keyed by a
+        hash of its drawing inputs (frame attribute arrays, texts, plot styles,
+        figure size, layered mode, rcParams and a digest of the first drawn frame,
+        which covers axes styling set by hand) and unchanged frames are read from
+        the cache instead of being drawn. Additional kwargs are passed to the frame
+        writer.
+
+        With `dedupe=True`, frames whose drawing inputs (frame attribute arrays and
+        texts, see `_frame_key`) are identical to the previous frame are not drawn,
+        the writer emits the previous frame again (see `FrameWriter.repeat`).
+        Plots with a custom post_update receive the frame index, so their frames are
+        never identical. Additional kwargs are passed to the frame writer.
+
+        With a `threshold`, frames that change less than the threshold from the last
+        drawn frame are dropped and the drawn frames are held for the dropped ones
+        (see `sample_frames`), so the timing of the animation is unchanged. gif and
+        webp files show held frames longer, other formats repeat them. Additional
+        kwargs are passed to the frame writer.
+
+        Layered canvases (see `Canvas(layered=True)`) always save through the
+        frame writer.
 
         Parameters
         ----------
@@ -109,6 +211,725 @@ class Canvas:
         fps : int
             Video fps / frames per second
         extension : str, optional
-            File extension, by default "gif"
+            File extension, an empty string writes a png sequence when pipelined,
+            by default "gif"
+        pipelined : bool, optional
+            Renders with the three stage pipeline, by default False
+        queue_size : int, optional
+            Maximum number of frames waiting between two pipeline stages, by default 8
+        resumable : bool, optional
+            Writes checkpointed segments that a later save can resume from,
+            by default False
+        segment_frames : int, optional
+            Number of frames per segment when resumable, by default 1000
+        cache : FrameCache, optional
+            Rendered frame cache, by default None
+        dedupe : bool, optional
+            Repeats the previous frame instead of drawing an identical one,
+            by default False
+        threshold : float, optional
+            Drops frames that change less than this fraction of the plot scale,
+            ie. 0.01, by default None
+
+        Returns
+        -------
+        SimpleNamespace
+            Only if pipelined, resumable, cached or deduplicated, the render
+            statistics: frames (drawn or repeated), wall_time, cache_hits,
+            cache_misses, skipped_frames (frames repeated by dedupe) and
+            dropped_frames (frames dropped by the threshold). Pipelined renders
+            also report busy, utilisation (fraction of wall time each stage was
+            busy) and bottleneck. Resumable renders report segments, rendered
+            (segments rendered by this call), resumed_from (first rendered frame)
+            and skipped_frames
         """
-        self.ani.save(f"{filename}.{extension}", fps=fps, **kwargs)
+        path = f"{filename}.{extension}" if extension else filename
+        if resumable:
+            return self._save_resumable(
+                path,
+                fps,
+                extension,
+                segment_frames,
+                pipelined,
+                queue_size,
+                cache,
+                dedupe,
+                threshold,
+                **kwargs,
+            )
+        if (
+            not pipelined
+            and cache is None
+            and not self.layered
+            and not dedupe
+            and threshold is None
+        ):
+            return self.ani.save(path, fps=fps, **kwargs)
+
+        frames, durations = self.get_frames(), None
+        if threshold is not None:
+            frames, durations = self.sample_frames(threshold, frames)
+        with get_writer(path, fps, **kwargs) as writer:
+            return self._write_frames(
+                frames, writer, pipelined, queue_size, cache, dedupe, durations
+            )
+
+    def save_many(
+        self,
+        outputs: list,
+        fps: int,
+        pipelined: bool = False,
+        queue_size: int = 8,
+        cache: FrameCache = None,
+        dedupe: bool = False,
+        threshold: float = None,
+    ) -> SimpleNamespace:
+        """Saves the animation to several outputs while drawing every frame once. The
+        frames are fanned out to one frame writer per output, each encoding on its
+        own thread, and resized once per output resolution (see
+        `pynimate.writers.MultiFrameWriter`). Outputs are paths, their extension
+        decides the format (see `render_range`), image paths (png, jpg) write a
+        poster frame (see `pynimate.writers.PosterWriter`). The drawing options are
+        the same as in `save`.
+
+        Outputs can also be dicts with a "path", an optional "size" (width, height)
+        in pixels, and additional kwargs passed to the frame writer, ie. "frame" to
+        select the poster frame.
+
+        ```
+            cnv.save_many(
+                [
+                    "race.mp4",
+                    {"path": "race.gif", "size": (640, 360)},
+                    {"path": "poster.png", "frame": 120},
+                ],
+                24,
+            )
+        ```
+
+        Parameters
+        ----------
+        outputs : list[Union[str, dict]]
+            Output paths or dicts
+        fps : int
+            Video fps / frames per second
+        pipelined : bool, optional
+            Renders with the three stage pipeline, by default False
+        queue_size : int, optional
+            Maximum number of frames waiting between two stages and for each
+            writer, by default 8
+        cache : FrameCache, optional
+            Rendered frame cache, by default None
+        dedupe : bool, optional
+            Repeats the previous frame instead of drawing an identical one,
+            by default False
+        threshold : float, optional
+            Drops frames that change less than this fraction of the plot scale,
+            ie. 0.01, by default None
+
+        Returns
+        -------
+        SimpleNamespace
+            The render statistics, see `save`
+        """
+        assert len(outputs) > 0, "No outputs to save"
+        writers = []
+        for output in outputs:
+            output = {"path": output} if isinstance(output, str) else dict(output)
+            path, size = output.pop("path"), output.pop("size", None)
+            extension = os.path.splitext(path)[1][1:].lower()
+            if extension in IMAGE_EXTENSIONS:
+                writers.append((PosterWriter(path, fps, **output), size))
+            else:
+                writers.append((get_writer(path, fps, **output), size))
+
+        frames, durations = self.get_frames(), None
+        if threshold is not None:
+            frames, durations = self.sample_frames(threshold, frames)
+        with MultiFrameWriter(writers, fps, queue_size) as writer:
+            return self._write_frames(
+                frames, writer, pipelined, queue_size, cache, dedupe, durations
+            )
+
+    def preview(
+        self,
+        path: str = "preview.gif",
+        budget_seconds: float = 10,
+        dpi: float = 50,
+        stride: int = None,
+        fps: int = 24,
+        **kwargs,
+    ) -> SimpleNamespace:
+        """Renders a quick low resolution preview from every `stride`th frame. If
+        stride is None, it is chosen from the measured cost of a few frames so that
+        the preview finishes within `budget_seconds`. Every frame is held for the
+        skipped ones, so the preview plays at the pace of the animation. Image
+        paths (png, jpg) write a contact sheet of the frames instead, see
+        `pynimate.writers.ContactSheetWriter`. Additional kwargs are passed to
+        the writer.
+
+        Parameters
+        ----------
+        path : str, optional
+            Output path, by default "preview.gif"
+        budget_seconds : float, optional
+            Time budget of the preview, by default 10
+        dpi : float, optional
+            Figure dpi of the preview, by default 50
+        stride : int, optional
+            Frame stride, by default chosen from the budget
+        fps : int, optional
+            Video fps / frames per second of the animation, by default 24
+
+        Returns
+        -------
+        SimpleNamespace
+            The render statistics (see `save`), with stride, dpi and frame_cost
+            (measured seconds per frame, None if stride was given)
+        """
+        start = time.perf_counter()
+        frames = self.get_frames()
+        if len(frames) == 0:
+            raise ValueError("The animation has no frames to preview")
+        original_dpi = self.fig.dpi
+        self.fig.set_dpi(dpi)
+        try:
+            frame_cost = None
+            if stride is None:
+                self._init()
+                self._background = None
+                # the first frame also pays for the setup
+                self._draw(frames[0])
+                probe = list(frames[:: max(1, len(frames) // 3)][:3])
+                probe_start = time.perf_counter()
+                for i in probe:
+                    self._draw(i)
+                frame_cost = (time.perf_counter() - probe_start) / len(probe)
+                remaining = budget_seconds - (time.perf_counter() - start)
+                stride = int(np.ceil(len(frames) * frame_cost / max(remaining, 1e-9)))
+            stride = max(1, min(stride, len(frames)))
+
+            selected = frames[::stride]
+            durations = [
+                min(stride, len(frames) - n) for n in range(0, len(frames), stride)
+            ]
+            extension = os.path.splitext(path)[1][1:].lower()
+            if extension in IMAGE_EXTENSIONS:
+                writer = ContactSheetWriter(path, fps, **kwargs)
+            else:
+                writer = get_writer(path, fps, **kwargs)
+            with writer:
+                stats = self._write_frames(selected, writer, durations=durations)
+        finally:
+            self.fig.set_dpi(original_dpi)
+        stats.stride, stats.dpi, stats.frame_cost = stride, dpi, frame_cost
+        stats.wall_time = time.perf_counter() - start
+        return stats
+
+    def iter_frames(self) -> Iterator[np.ndarray]:
+        """Renders the frames of `get_frames()` in order, without writing them.
+
+        Yields
+        ------
+        np.ndarray
+            RGBA frames of shape `(height, width, 4)`, views on the Agg buffer valid
+            until the next frame is drawn
+        """
+        self._init()
+        self._background = None
+        try:
+            for i in self.get_frames():
+                yield self._draw(i)
+        finally:
+            self._reset_layers()
+
+    def save_from_iter(
+        self,
+        frames: Iterable[np.ndarray],
+        filename: str,
+        fps: int,
+        extension: str = "gif",
+        **kwargs,
+    ) -> SimpleNamespace:
+        """Encodes frames produced outside the canvas, ie. frames of `iter_frames`
+        transformed by the caller, with a frame writer (see `render_range` for the
+        supported extensions). Additional kwargs are passed to the frame writer.
+
+        Parameters
+        ----------
+        frames : Iterable[np.ndarray]
+            uint8 RGBA or RGB frames of the same size, each frame is encoded before
+            the next one is requested
+        filename : str
+            Filename
+        fps : int
+            Video fps / frames per second
+        extension : str, optional
+            File extension, an empty string writes a png sequence, by default "gif"
+
+        Returns
+        -------
+        SimpleNamespace
+            frames and wall_time
+        """
+        path = f"{filename}.{extension}" if extension else filename
+        start = time.perf_counter()
+        with get_writer(path, fps, **kwargs) as writer:
+            for frame in frames:
+                assert (
+                    frame.dtype == np.uint8
+                ), f"Frames must be uint8, not {frame.dtype}"
+                writer.write(frame)
+        return SimpleNamespace(
+            frames=writer.n_frames, wall_time=time.perf_counter() - start
+        )
+
+    def set_frame_cache(self, max_frames: int = 32) -> None:
+        """Sets the number of recently rendered frames kept by `render_frame`,
+        0 disables the cache. Clears the cached frames.
+
+        Parameters
+        ----------
+        max_frames : int, optional
+            Maximum number of cached frames, by default 32
+        """
+        assert max_frames >= 0, "max_frames must be non-negative"
+        self.frame_cache_size = max_frames
+        self.clear_frame_cache()
+
+    def clear_frame_cache(self) -> None:
+        """Drops the frames cached by `render_frame`, the next frame initializes the
+        plots again. Call it after changing the plots or the figure."""
+        self._frame_lru = OrderedDict()
+        self._render_ready = False
+
+    def render_frame(self, i: int) -> np.ndarray:
+        """Renders only the frame at index `i` of `get_frames()`, without going
+        through the animation. The last `frame_cache_size` frames (see
+        `set_frame_cache`) are kept, rendering them again returns the cached frame.
+
+        Parameters
+        ----------
+        i : int
+            Frame index
+
+        Returns
+        -------
+        np.ndarray
+            RGB frame of shape `(height, width, 3)`. A read-only copy if the cache
+            is enabled, otherwise a view on the Agg buffer, valid until the next
+            frame is drawn
+        """
+        return next(self.render_frames([i]))
+
+    def render_frames(self, indices: Iterable[int]) -> Iterator[np.ndarray]:
+        """Renders the frames at the given indices of `get_frames()` in order, see
+        `render_frame`. Cached frames are not drawn again and repeated indices are
+        drawn once.
+
+        Parameters
+        ----------
+        indices : Iterable[int]
+            Frame indices
+
+        Yields
+        ------
+        np.ndarray
+            RGB frames of shape `(height, width, 3)`
+        """
+        frames = self.get_frames()
+        lru, last = self._frame_lru, None
+        for i in indices:
+            assert -len(frames) <= i < len(frames), f"Frame index {i} out of range"
+            i %= len(frames)
+            if i in lru:
+                lru.move_to_end(i)
+                yield lru[i]
+                continue
+            if last is not None and last[0] == i:
+                # the buffer still holds it
+                yield last[1]
+                continue
+            if not self._render_ready:
+                self._init()
+                self._background = None
+                self._render_ready = True
+            rgb = self._draw(frames[i])[..., :3]
+            if self.frame_cache_size:
+                rgb = np.array(rgb)
+                rgb.flags.writeable = False
+                lru[i] = rgb
+                if len(lru) > self.frame_cache_size:
+                    lru.popitem(last=False)
+            last = (i, rgb)
+            yield rgb
+
+    def _figure_digest(self, i: int) -> str:
+        # a drawn frame holds the axes and figure styling that the plots do not
+        # configure, ie. facecolors, spines, grids or labels set by hand
+        return hashlib.sha256(self._draw(i)).hexdigest()
+
+    def _style_hash(self, figure_digest: str = None) -> str:
+        return config_hash(
+            tuple(self.fig.get_size_inches()),
+            self.fig.dpi,
+            self.fig.get_facecolor(),
+            self.post_update,
+            self.layered,
+            _style_params(),
+            figure_digest,
+            [plot.style() for plot in self.plots],
+        )
+
+    def _frame_key(self, style_hash: str, frames: list) -> str:
+        return config_hash(
+            style_hash,
+            [plot.frame_inputs(frame) for plot, frame in zip(self.plots, frames)],
+        )
+
+    def _write_frames(
+        self,
+        frames: list,
+        writer,
+        pipelined: bool = False,
+        queue_size: int = 8,
+        cache: FrameCache = None,
+        dedupe: bool = False,
+        durations: list = None,
+        figure_digest: str = None,
+    ) -> SimpleNamespace:
+        keyed = cache is not None or dedupe
+        hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+        self._init()
+        self._background = None
+        style_hash = None
+        if keyed:
+            # dedupe only compares frames of this save, their styling is shared
+            all_frames = self.get_frames()
+            if cache is not None and figure_digest is None and len(all_frames):
+                figure_digest = self._figure_digest(all_frames[0])
+            style_hash = self._style_hash(figure_digest)
+        last = SimpleNamespace(key=None, skipped=0)
+        # frames are shown for `duration` frame intervals, see `sample_frames`
+        items = list(zip(frames, durations or [1] * len(frames)))
+
+        def prepare(item):
+            frames = self._get_frame(item[0])
+            if not keyed:
+                return frames, None
+            return frames, self._frame_key(style_hash, frames)
+
+        def draw(item, prepared):
+            # None repeats the previous frame
+            (i, duration), (frames, key) = item, prepared
+            if dedupe and key == last.key:
+                last.skipped += 1
+                return None, duration
+            last.key = key
+            if cache is not None:
+                rgba = cache.get(key)
+                if rgba is not None:
+                    return rgba, duration
+            rgba = self._draw(i, frames)
+            if cache is not None:
+                cache.put(key, rgba)
+            return rgba, duration
+
+        def copy(drawn):
+            # pipelined frames must outlive the next draw
+            rgba, duration = drawn
+            return (None if rgba is None else np.array(rgba)), duration
+
+        def write(drawn):
+            rgba, duration = drawn
+            if rgba is None:
+                writer.repeat(duration)
+            else:
+                writer.write(rgba, duration)
+
+        try:
+            if pipelined:
+                stats = run_pipeline(
+                    items,
+                    prepare,
+                    lambda item, prepared: copy(draw(item, prepared)),
+                    write,
+                    queue_size,
+                )
+            else:
+                start = time.perf_counter()
+                for item in items:
+                    write(draw(item, prepare(item)))
+                stats = SimpleNamespace(
+                    frames=len(items), wall_time=time.perf_counter() - start
+                )
+        finally:
+            self._reset_layers()
+        stats.cache_hits = cache.hits - hits if cache is not None else 0
+        stats.cache_misses = cache.misses - misses if cache is not None else 0
+        stats.skipped_frames = last.skipped
+        stats.dropped_frames = sum(duration for _, duration in items) - len(items)
+        return stats
+
+    def _reset_layers(self) -> None:
+        if self._background is not None:
+            self._background = None
+            for plot in self.plots:
+                plot.set_layered(False)
+
+    def config_hash(self, *extra) -> str:
+        """Hashes the canvas configuration: frames, figure size, dpi, post_update,
+        layered mode, rcParams and every plot including its datafier, decorations
+        and callbacks.
+
+        Returns
+        -------
+        str
+            Hex digest of the configuration
+        """
+        return config_hash(
+            list(self.get_frames()),
+            tuple(self.fig.get_size_inches()),
+            self.fig.dpi,
+            self.fig.get_facecolor(),
+            self.post_update,
+            self.layered,
+            _style_params(),
+            *self.plots,
+            *extra,
+        )
+
+    def _save_resumable(
+        self,
+        path: str,
+        fps: int,
+        extension: str,
+        segment_frames: int,
+        pipelined: bool,
+        queue_size: int,
+        cache: FrameCache,
+        dedupe: bool,
+        threshold: float,
+        **kwargs,
+    ) -> SimpleNamespace:
+        directory = f"{path}.segments"
+        journal = os.path.join(directory, "manifest.json")
+        frames = self.get_frames()
+        current_hash = self.config_hash(fps, kwargs)
+
+        manifest = None
+        if os.path.exists(journal):
+            manifest = SegmentManifest.load(journal)
+            if manifest.config_hash != current_hash:
+                warnings.warn(
+                    f"The configuration changed since {journal} was written, "
+                    "rendering every segment again"
+                )
+                manifest = None
+        if manifest is None:
+            manifest = self.plan_segments(
+                directory, fps, segment_frames=segment_frames, extension=extension
+            )
+            manifest.config_hash = current_hash
+            manifest.save()
+
+        missing = [seg for seg in manifest.segments if not manifest.is_complete(seg)]
+        skipped, figure_digest = 0, None
+        if cache is not None and missing:
+            # drawn once and shared by the segments, see `_figure_digest`
+            self._init()
+            figure_digest = self._figure_digest(frames[0])
+        for seg in missing:
+            seg_path = manifest.resolve(seg.path)
+            partial = os.path.join(directory, f"partial_{seg.path}")
+            if os.path.isdir(partial):
+                shutil.rmtree(partial)
+            seg_frames, durations = frames[seg.start : seg.stop], None
+            if threshold is not None:
+                seg_frames, durations = self.sample_frames(threshold, seg_frames)
+            with get_writer(partial, fps, **kwargs) as writer:
+                stats = self._write_frames(
+                    seg_frames,
+                    writer,
+                    pipelined,
+                    queue_size,
+                    cache,
+                    dedupe,
+                    durations,
+                    figure_digest,
+                )
+            skipped += stats.skipped_frames
+            if os.path.isdir(seg_path):
+                shutil.rmtree(seg_path)
+            os.replace(partial, seg_path)
+            manifest.mark_done(seg)
+
+        concat(manifest, path)
+        shutil.rmtree(directory)
+        return SimpleNamespace(
+            segments=len(manifest.segments),
+            rendered=len(missing),
+            resumed_from=missing[0].start if missing else len(frames),
+            skipped_frames=skipped,
+        )
+
+    def get_frames(self) -> list:
+        """Returns the frames of the animation, as set by `animate(frames_callback)`.
+        Defaults to every frame if `animate` has not been called.
+
+        Returns
+        -------
+        list
+            Sequence of frames passed to the update function
+        """
+        frames = self.length if self.frames is None else self.frames
+        return range(frames) if isinstance(frames, int) else list(frames)
+
+    def sample_frames(self, threshold: float, frames: list = None) -> tuple[list, list]:
+        """Selects the frames worth drawing. A frame is kept if a plot changed by at
+        least `threshold` since the last kept frame (see `Baseplot.visual_delta`)
+        or if one of its texts changed. The first and last frames are always kept.
+        Every kept frame is held until the next one, so the durations add up to
+        the number of input frames.
+
+        Parameters
+        ----------
+        threshold : float
+            Minimum change, as a fraction of the plot scale (ie. bar heights,
+            longest bar, axis spans)
+        frames : list, optional
+            Frames to sample, by default `get_frames()`
+
+        Returns
+        -------
+        tuple[list, list]
+            The kept frames and the number of frame intervals each is shown for
+        """
+        frames = self.get_frames() if frames is None else frames
+        if len(frames) == 0:
+            return [], []
+
+        def plot_frames(i):
+            return [min(plot.length - 1, i) for plot in self.plots]
+
+        def texts(i):
+            return [plot.frame_texts(j) for plot, j in zip(self.plots, plot_frames(i))]
+
+        kept = [0]
+        last_frames, last_texts = plot_frames(frames[0]), texts(frames[0])
+        for n in range(1, len(frames)):
+            current = plot_frames(frames[n])
+            changed = n == len(frames) - 1 or any(
+                plot.visual_delta(i, j) >= threshold
+                for plot, i, j in zip(self.plots, last_frames, current)
+            )
+            current_texts = None
+            if not changed:
+                current_texts = texts(frames[n])
+                changed = current_texts != last_texts
+            if changed:
+                kept.append(n)
+                last_frames = current
+                last_texts = current_texts or texts(frames[n])
+        durations = np.diff(kept + [len(frames)]).tolist()
+        return [frames[n] for n in kept], durations
+
+    def _draw(self, i: int, frames: list = None) -> np.ndarray:
+        canvas = self.fig.canvas
+        if not self.layered:
+            self._update(i, frames)
+            canvas.draw()
+            return np.asarray(canvas.buffer_rgba())
+
+        self._update(i, frames)
+        if self._background is None:
+            # the layers are split once the frame artists exist, see
+            # `Baseplot.dynamic_artists`
+            for plot in self.plots:
+                plot.set_layered(True)
+            canvas.draw()
+            self._background = canvas.copy_from_bbox(self.fig.bbox)
+        canvas.restore_region(self._background)
+        renderer = canvas.get_renderer()
+        for plot in self.plots:
+            plot.draw_dynamic(renderer)
+        return np.asarray(canvas.buffer_rgba())
+
+    def render_range(self, start: int, stop: int, path: str, fps: int, **kwargs):
+        """Renders the frames `[start, stop)` into an independently decodable segment.
+        The output format is decided by the extension of `path` (mp4, mkv, mov, webm
+        and avi use ffmpeg, gif and webp use Pillow, no extension writes a png sequence
+        directory). Additional kwargs are passed to the frame writer.
+
+        Parameters
+        ----------
+        start : int
+            Index of the first frame
+        stop : int
+            Index of the end frame (exclusive)
+        path : str
+            Output path
+        fps : int
+            Video fps / frames per second
+        """
+        frames = self.get_frames()
+        assert 0 <= start < stop <= len(frames), f"Invalid frame range [{start}, {stop})"
+        with get_writer(path, fps, **kwargs) as writer:
+            self._write_frames(frames[start:stop], writer)
+
+    def plan_segments(
+        self,
+        directory: str,
+        fps: int,
+        n_segments: int = None,
+        segment_frames: int = None,
+        extension: str = "mp4",
+    ) -> SegmentManifest:
+        """Splits the animation into segments that can be rendered on different machines
+        with `render_range`, and writes the manifest to `directory/manifest.json`.
+        Once every segment is rendered, `pynimate.segments.concat` stitches them.
+
+        Parameters
+        ----------
+        directory : str
+            Directory of the manifest and the segments
+        fps : int
+            Video fps / frames per second
+        n_segments : int, optional
+            Number of segments, by default None
+        segment_frames : int, optional
+            Number of frames per segment, used if n_segments is None, by default None
+        extension : str, optional
+            Segment file extension, an empty string writes png sequences, by default "mp4"
+
+        Returns
+        -------
+        SegmentManifest
+            The segment manifest
+
+        Example:
+        ```
+            >>> manifest = cnv.plan_segments("segments", 24, n_segments=4)
+            >>> # on every machine
+            >>> seg = manifest.segments[k]
+            >>> cnv.render_range(seg.start, seg.stop, manifest.resolve(seg.path), 24)
+            >>> # once all segments are done
+            >>> from pynimate.segments import concat
+            >>> concat(manifest, "animation.mp4")
+        ```
+        """
+        assert (
+            n_segments or segment_frames
+        ), "Either n_segments or segment_frames should be passed"
+        n_frames = len(self.get_frames())
+        if segment_frames is None:
+            segment_frames = int(np.ceil(n_frames / n_segments))
+
+        os.makedirs(directory, exist_ok=True)
+        manifest = SegmentManifest(fps, n_frames)
+        suffix = f".{extension}" if extension else ""
+        for n, start in enumerate(range(0, n_frames, segment_frames)):
+            stop = min(start + segment_frames, n_frames)
+            manifest.add(start, stop, f"segment_{n:04d}{suffix}")
+        manifest.save(os.path.join(directory, "manifest.json"))
+        return manifest
@@ -1,9 +1,12 @@
 import warnings
 
+import matplotlib.dates as mdates
 import numpy as np
 import pandas as pd
 import seaborn as sns
 
+from pynimate.shared import SharedDatafier
+
 
 class Datafier:
     def __init__(
@@ -109,7 +112,11 @@ class Datafier:
         col_var : pd.DataFrame, optional
             Dataframe containing variables related to columns, by default None
         """
-        self.row_var = self.interpolateEven(row_var, self.ip_freq) if row_var else None
+        self.row_var = (
+            self.interpolate_even(row_var, self.ip_freq)
+            if row_var is not None
+            else None
+        )
         self.col_var = col_var
 
     def interpolate(
@@ -277,12 +284,16 @@ class BaseDatafier:
             Interpolation frequency
         """
         self.raw_data = data
+        self.time_format = time_format
         self.ip_freq = ip_freq
         self.ip_method = ip_method
         self.colorable_columns = self.raw_data.columns
         self.raw_data.index = pd.to_datetime(self.raw_data.index, format=time_format)
         self.expanded = self.data = self.raw_data
         self.data = self.interpolate_data()
+        self.row_var = self.col_var = None
+        self.row_vars = {}
+        self.col_vars = {}
 
     def add_var(self, row_var: pd.DataFrame = None, col_var: pd.DataFrame = None):
         """Adds additional variables to the data, both row and column wise.\n
@@ -306,9 +317,90 @@ class BaseDatafier:
             Dataframe containing variables related to time, by default None
         col_var : pd.DataFrame, optional
             Dataframe containing variables related to columns, by default None
+
+        The variables are also stored column-wise for per-frame access by position:
+        `row_vars` maps every row variable to an array aligned with the frame index
+        (`self.data.index`) and `col_vars` maps every column variable to an array
+        aligned with `self.data.columns`. Numeric row variables are interpolated
+        and others are forward filled, non-numeric column variables are categorical.
+        ```
+            >>> dfr.row_vars["leap_year"][i]
+            >>> dfr.col_vars["continent"][column_positions]
+        ```
         """
-        self.row_var = self.interpolate_even(row_var, self.ip_freq) if row_var else None
-        self.col_var = col_var
+        if row_var is not None:
+            self.row_var = self.align_row_var(row_var)
+            self.row_vars = {
+                name: self.row_var[name].to_numpy() for name in self.row_var.columns
+            }
+        if col_var is not None:
+            self.col_var = col_var
+            self.col_vars = self.align_col_var(col_var)
+
+    def align_row_var(self, row_var: pd.DataFrame) -> pd.DataFrame:
+        """Aligns row-wise variables with the frame index. Numeric variables are
+        interpolated with `ip_method`, others are forward (then backward) filled.
+
+        Parameters
+        ----------
+        row_var : pd.DataFrame
+            Dataframe containing variables related to time
+
+        Returns
+        -------
+        pd.DataFrame
+            Variables indexed by `self.data.index`
+        """
+        row_var = row_var.copy()
+        if not isinstance(row_var.index, pd.DatetimeIndex):
+            row_var.index = pd.to_datetime(row_var.index, format=self.time_format)
+        index = self.data.index
+        aligned = row_var.reindex(row_var.index.union(index))
+        numeric = row_var.select_dtypes("number").columns
+        others = row_var.columns.difference(numeric)
+        aligned[numeric] = aligned[numeric].interpolate(method=self.ip_method)
+        aligned[others] = aligned[others].ffill().bfill()
+        return aligned.reindex(index)[row_var.columns]
+
+    def align_col_var(self, col_var: pd.DataFrame) -> dict:
+        """Encodes column-wise variables as arrays aligned with `self.data.columns`,
+        numeric variables as float arrays and others as categorical arrays.
+
+        Parameters
+        ----------
+        col_var : pd.DataFrame
+            Dataframe containing variables related to columns
+
+        Returns
+        -------
+        dict
+            Variable name to array mapping
+        """
+        col_var = col_var.reindex(self.data.columns)
+        return {
+            name: values.to_numpy(dtype=float)
+            if pd.api.types.is_numeric_dtype(values)
+            else pd.Categorical(values)
+            for name, values in col_var.items()
+        }
+
+    def export_shared(self) -> SharedDatafier:
+        """Publishes the prepared arrays in shared memory for render workers.
+        Pass the returned handle to the workers (directly or through
+        `plot.to_spec(shared=handle)`) and call `handle.attach()` there.
+
+        Returns
+        -------
+        SharedDatafier
+            Picklable shared memory handle
+
+        Example:
+        ```
+            >>> with dfr.export_shared() as handle:
+            >>>     pool.map(render_worker, [(handle, start, stop) for ...])
+        ```
+        """
+        return SharedDatafier(self)
 
     def interpolate_even(
         self, data: pd.DataFrame, freq: str, method: str = "linear"
@@ -520,6 +612,7 @@ class LineDatafier(BaseDatafier):
         """
         super().__init__(data, time_format, ip_freq, ip_method)
         self.data = self.prepare_data()
+        self.time_num = self.get_time_num()
 
     def prepare_data(self) -> pd.DataFrame:
         """Creates interpolated data
@@ -530,3 +623,14 @@ class LineDatafier(BaseDatafier):
             Interpolated data values
         """
         return self.interpolate_even(self.raw_data, self.ip_freq, self.ip_method)
+
+    def get_time_num(self) -> np.ndarray:
+        """Converts the time index to matplotlib date numbers, once, so plots can
+        pass the time axis to their artists without datetime conversions
+
+        Returns
+        -------
+        np.ndarray
+            float64 date numbers of `self.data.index`
+        """
+        return np.asarray(mdates.date2num(self.data.index), dtype=np.float64)
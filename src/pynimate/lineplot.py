@@ -1,19 +1,31 @@
+from types import SimpleNamespace
 from typing import Callable, Union
 
-import matplotlib.dates as mdates
+import matplotlib as mpl
+import numpy as np
 import pandas as pd
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 
-from pynimate.baseplot import Baseplot
+from pynimate.baseplot import Baseplot, _default_post_update
 from pynimate.datafier import LineDatafier
+from pynimate.lod import LineDecimator, SlidingExtrema
+from pynimate.texts import attach_artist
 from pynimate.utils import human_readable
 
 
+def _default_line_annot(col: str, val: float) -> str:
+    return f"{col}({human_readable(val)})"
+
+
 class Lineplot(Baseplot):
+    _runtime_attrs = Baseplot._runtime_attrs + ("X", "Y", "Y_og", "annot", "line_attr")
+
     def __init__(
         self,
         datafier: LineDatafier,
         palettes: list[str] = ["viridis"],
-        post_update: Callable[[__qualname__, int], None] = lambda self, i: None,
+        post_update: Callable[[__qualname__, int], None] = _default_post_update,
         line_annots: bool = True,
         legend: bool = True,
         scatter_markers: bool = True,
@@ -80,6 +92,8 @@ class Lineplot(Baseplot):
         self.set_line_head()
         self.set_marker()
         self.set_legend()
+        self.set_lod(None)
+        self.set_window(None)
 
     @classmethod
     def from_df(
@@ -88,7 +102,7 @@ class Lineplot(Baseplot):
         time_format: str,
         ip_freq: str,
         palettes: list[str] = ["viridis"],
-        post_update: Callable[[__qualname__, int], None] = lambda self, i: None,
+        post_update: Callable[[__qualname__, int], None] = _default_post_update,
         line_annots: bool = True,
         legend: bool = True,
         scatter_markers: bool = True,
@@ -151,34 +165,68 @@ class Lineplot(Baseplot):
             linestyles, self.column_linestyles
         )
 
-    def set_line(self, **kwargs) -> None:
-        """Sets line properties, addition kwargs are passed to `ax.plot(**kwargs)`"""
+    def set_line(self, backend: str = "artists", **kwargs) -> None:
+        """Sets line properties, addition kwargs are passed to `ax.plot(**kwargs)`
+
+        The "collection" backend draws every line as part of a single persistent
+        LineCollection, the markers and the line heads as one PathCollection each,
+        which keeps the frame cost low for many columns. Additional kwargs are then
+        passed to `LineCollection(**kwargs)`.
+
+        Parameters
+        ----------
+        backend : str, optional
+            Line rendering backend, "artists" or "collection", by default "artists"
+        """
         assert (
             "linestyle" not in kwargs
         ), "Use 'set_column_linestyle()' for linestyle customization"
+        assert backend in (
+            "artists",
+            "collection",
+        ), f"Unknown backend {backend}, use 'artists' or 'collection'"
 
         self.line_props = kwargs
+        self.line_backend = backend
 
     def set_line_annots(
         self,
-        callback: Callable[
-            [str, float], str
-        ] = lambda col, val: f"{col}({human_readable(val)})",
+        callback: Callable[[str, float], str] = _default_line_annot,
         size: float = 10,
+        batch: bool = False,
+        with_vars: bool = False,
         **kwargs,
     ) -> None:
         """Sets line annotation properties, additional kwargs are passed to `ax.text(**kwargs)`.
         (Note these annotations are the texts leading the lines)
 
+        With `batch=True` the callback formats every line of a frame at once, it
+        receives the array of columns and the array of values and returns a
+        sequence of texts, ie. `lambda cols, vals: cols + human_readable_array(vals)`.
+        With `with_vars=True` the callback also receives the row variables of the
+        frame and the column variables of the column(s), see `get_ith_line_attrs`,
+        ie. `lambda col, val, row_vars, col_vars: f"{col} {col_vars['unit']}"`.
+        The texts of each frame are cached.
+
         Parameters
         ----------
         callback : Callable[ [str, float], str ], optional
             Callback function for customizing the text, by default lambda col, val: f"{col}({human_readable(val)})"
         size : float, optional
             Text size, by default 10
+        batch : bool, optional
+            Calls the callback once per frame with arrays, by default False
+        with_vars : bool, optional
+            Passes the row and column variables to the callback, by default False
         """
         kwargs = {"size": size, **kwargs}
-        self.line_annot_props = {"callback": callback, "kwargs": kwargs}
+        self.line_annot_props = {
+            "callback": callback,
+            "batch": batch,
+            "with_vars": with_vars,
+            "kwargs": kwargs,
+        }
+        self._label_cache.pop("line_annots", None)
 
     def set_line_head(self, edgecolors: Union[str, list[str]] = "k", **kwargs) -> None:
         """Sets the line head(leading marker) properites, additional kwargs are passed to `ax.scatter(**kwargs)`
@@ -198,42 +246,423 @@ class Lineplot(Baseplot):
         """Sets legend properties, kwargs are passed to `ax.legend(**kwargs)`"""
         self.legend_props = kwargs
 
-    def update(self, i) -> None:
-        self.ax.clear()
-        for col in self.dfr.data.columns:
-            self.X, self.Y = self.dfr.data.index, self.dfr.data[col]
-            self.Y_og = self.dfr.expanded[col]
+    def set_lod(self, method: str = "minmax", pixels: int = None) -> None:
+        """Sets the level of detail of the lines. The visible history of every line
+        is downsampled to a few points per pixel column of the axes, see
+        `pynimate.lod.LineDecimator`. Buckets span the whole time range of the data,
+        so the decimation matches the pixels when the xlim is fixed to it.
+
+        Parameters
+        ----------
+        method : str, optional
+            "minmax" keeps the first, min, max and last point per pixel column, "lttb"
+            keeps one point per pixel column with Largest Triangle Three Buckets, None
+            draws every point, by default "minmax"
+        pixels : int, optional
+            Number of pixel columns, by default the width of the axes in pixels
+        """
+        assert method in (None, "minmax", "lttb"), f"Unknown LOD method {method}"
+        self.lod_props = {"method": method, "pixels": pixels}
+
+    def set_window(self, window: Union[int, str, pd.Timedelta] = None) -> None:
+        """Sets a sliding window, the x axis then follows the current frame with a
+        fixed width and only the points inside the window are drawn. If ylim is not
+        fixed, it is set from the minimum and maximum values inside the window.
+        Level of detail (see `set_lod`) is not applied to windowed lines.
+
+        Parameters
+        ----------
+        window : Union[int, str, pd.Timedelta], optional
+            Window width as a number of (interpolated) rows or as a time span,
+            ie. "30D", None draws the whole history, by default None
+        """
+        self.window = window
+        self._schedule = None
+
+    def _window_rows(self) -> int:
+        if isinstance(self.window, (int, np.integer)):
+            return int(self.window)
+        index = self.dfr.data.index
+        step = index[1] - index[0] if len(index) > 1 else pd.Timedelta(1)
+        return max(1, int(np.ceil(pd.Timedelta(self.window) / step)))
+
+    def _dynamic_axes(self) -> list:
+        axes = super()._dynamic_axes()
+        if self.window is not None and self.ax.xaxis not in axes:
+            axes.append(self.ax.xaxis)
+        return axes
+
+    def _restore(self) -> None:
+        super()._restore()
+        self._line_collections = None
+        self._line_data = None
+        self._decimator = None
+        self._extrema = None
+
+    def init(self) -> None:
+        super().init()
+        # the artists get date numbers, the first date sets up the date axis
+        self.ax.xaxis.update_units(self.dfr.data.index[:1])
+        self._line_collections = None
+        self._line_data = None
+        self._decimator = None
+        self._extrema = None
+
+    def _dynamic_limits(self) -> dict:
+        data = self._get_line_data()
+        limits = {}
+        if not self.fixed_xlim and self.window is None:
+            low = np.full(len(data.x), data.x[0])
+            limits["x"] = (*self._margins(low, data.x, "x"), False)
+        if not self.fixed_ylim:
+            if self.window is None:
+                low, high = data.ymin, data.ymax
+            else:
+                window = self._window_rows()
+                extrema = SlidingExtrema(data.row_min, data.row_max, window)
+                low, high = np.array([extrema.get(i) for i in range(len(data.x))]).T
+            limits["y"] = (*self._margins(low, high, "y"), True)
+        return limits
+
+    def visual_delta(self, i: int, j: int) -> float:
+        """Measures the visible change of the lines from frame i to frame j, see
+        `Baseplot.visual_delta`. It is the largest move of a line head, relative to
+        the x and y spans of the axes.
+
+        Parameters
+        ----------
+        i : int
+            First frame index
+        j : int
+            Second frame index
+
+        Returns
+        -------
+        float
+            The change, 0 if the lines look the same
+        """
+        data = self._get_line_data()
+        if self.window is not None:
+            step = data.x[1] - data.x[0] if len(data.x) > 1 else 1
+            x_span = self._window_rows() * step
+        elif self.fixed_xlim:
+            x_span = data.x[-1] - data.x[0]
+        else:
+            x_span = data.x[j] - data.x[0]
+        y_span = data.ymax[j] - data.ymin[j]
+        tiny = np.finfo(float).tiny
+        dx = abs(data.x[j] - data.x[i]) / max(x_span, tiny)
+        dy = np.abs(data.y[j] - data.y[i]) / max(y_span, tiny)
+        return float(np.nan_to_num(max(dx, np.nanmax(dy, initial=0.0))))
+
+    def _first_row(self, i: int) -> int:
+        # first row drawn in the ith frame
+        return 0 if self.window is None else max(0, i - self._window_rows() + 1)
+
+    def _set_window_lims(self, i: int) -> None:
+        data = self._get_line_data()
+        width = self._window_rows()
+        step = data.x[1] - data.x[0] if len(data.x) > 1 else 1
+        self.ax.set_xlim(data.x[i] - width * step, data.x[i])
+        if self.fixed_ylim or self.lim_schedule is not None:
+            return
+        if self._extrema is None:
+            self._extrema = SlidingExtrema(data.row_min, data.row_max, width)
+        low, high = self._extrema.get(i)
+        if np.isfinite(low) and np.isfinite(high):
+            margin = (high - low) * self.ax.margins()[1] or 0.5
+            self.ax.set_ylim(low - margin, high + margin)
+
+    def _get_lines(self, i: int) -> np.ndarray:
+        # points of every line up to row i, shape (columns, points, 2)
+        data = self._get_line_data()
+        if self.window is not None or self.lod_props["method"] is None:
+            return data.xy[:, self._first_row(i) : i + 1]
+        if self._decimator is None:
+            pixels = self.lod_props["pixels"] or self.ax.get_window_extent().width
+            self._decimator = LineDecimator(
+                data.x,
+                data.y,
+                np.ceil(len(data.x) / max(pixels, 1)),
+                self.lod_props["method"],
+            )
+        return self._decimator.get(i)
+
+    def _clear_frame(self) -> None:
+        # the hidden legend lines of the previous frame stay out of the data limits
+        if self._line_collections is not None:
+            for proxy in self._line_collections.proxies:
+                proxy.set_data([], [])
+        super()._clear_frame()
+
+    def _persistent_artists(self) -> list:
+        if self._line_collections is None:
+            return []
+        collections = self._line_collections
+        artists = [collections.lines, collections.markers, collections.heads]
+        artists += [collections.legend, *collections.proxies]
+        return [artist for artist in artists if artist is not None]
+
+    def _get_line_data(self) -> SimpleNamespace:
+        # arrays of the collection backend, computed once per animation
+        if self._line_data is None:
+            data = self.dfr.data
+            x = self.dfr.time_num
+            y = data.to_numpy(dtype=float)
+            y_og = self.dfr.expanded[data.columns].to_numpy(dtype=float)
+            colors = self._column_rgba()
+            # markers of every column, ordered by row so each frame shows a prefix
+            rows, cols = np.nonzero(~np.isnan(y_og))
+            order = np.argsort(rows, kind="stable")
+            rows, cols = rows[order], cols[order]
+            self._line_data = SimpleNamespace(
+                x=x,
+                y=y,
+                y_og=y_og,
+                xy=np.stack([np.broadcast_to(x, y.T.shape), y.T], axis=-1),
+                colors=colors,
+                linestyles=[self.column_linestyles[col] for col in data.columns],
+                marker_rows=rows,
+                marker_offsets=np.column_stack([x[rows], y_og[rows, cols]]),
+                marker_colors=colors[cols],
+                row_min=data.min(axis=1).to_numpy(),
+                row_max=data.max(axis=1).to_numpy(),
+                ymin=data.min(axis=1).cummin().to_numpy(),
+                ymax=data.max(axis=1).cummax().to_numpy(),
+            )
+        return self._line_data
+
+    def _make_line_collections(self) -> SimpleNamespace:
+        data = self._get_line_data()
+        columns = self.dfr.data.columns
+        lines = LineCollection(
+            [],
+            colors=data.colors,
+            linestyles=data.linestyles,
+            **self.line_props,
+        )
+        self.ax.add_collection(lines, autolim=False)
+        collections = SimpleNamespace(
+            lines=lines, markers=None, heads=None, legend=None, proxies=[]
+        )
+        if self.scatter_markers:
+            collections.markers = self.ax.scatter([], [], **self.marker_props)
+        if self.line_head:
+            collections.heads = self.ax.scatter([], [], **self.line_head_props)
+        if self.legend:
+            handles = [
+                Line2D(
+                    [],
+                    [],
+                    color=data.colors[n],
+                    linestyle=data.linestyles[n],
+                    label=col,
+                    **self.line_props,
+                )
+                for n, col in enumerate(columns)
+            ]
+            collections.legend = self.ax.legend(handles=handles, **self.legend_props)
+            loc = self.legend_props.get("loc", mpl.rcParams["legend.loc"])
+            if loc in ("best", 0):
+                # "best" only avoids line artists, hidden lines following the
+                # segments place the legend as in the artists backend
+                collections.proxies = [
+                    attach_artist(self.ax, Line2D([], [], visible=False))
+                    for _ in columns
+                ]
+        return collections
+
+    def _update_line_collections(self, i: int) -> None:
+        """Updates the collection backend: line segments are views on the
+        precomputed arrays and markers are a growing prefix of the marker offsets.
+        """
+        data = self._get_line_data()
+        if self._line_collections is None:
+            self._line_collections = self._make_line_collections()
+        else:
+            for artist in (
+                self._line_collections.lines,
+                self._line_collections.markers,
+                self._line_collections.heads,
+                *self._line_collections.proxies,
+            ):
+                if artist is not None:
+                    attach_artist(self.ax, artist)
+
+        segments = self._get_lines(i)
+        self._line_collections.lines.set_segments(segments)
+        for proxy, segment in zip(self._line_collections.proxies, segments):
+            proxy.set_data(segment[:, 0], segment[:, 1])
+        markers = self._line_collections.markers
+        if markers is not None:
+            first, n = np.searchsorted(data.marker_rows, [self._first_row(i), i])
+            markers.set_offsets(data.marker_offsets[first:n])
+            markers.set_facecolor(data.marker_colors[first:n])
+            if "edgecolors" not in self.marker_props:
+                markers.set_edgecolor(data.marker_colors[first:n])
+        heads = self._line_collections.heads
+        if heads is not None:
+            heads.set_offsets(data.xy[:, i])
+            heads.set_facecolor(data.colors)
+
+        if self.window is not None:
+            self._set_window_lims(i)
+            return
+        corners = np.array(
+            [[data.x[0], data.ymin[i]], [data.x[i], data.ymax[i]]], dtype=float
+        )
+        if not np.isnan(corners).any():
+            self.ax.update_datalim(corners)
+        self.ax.autoscale_view()
+
+    def get_frame(self, i: int) -> SimpleNamespace:
+        """Prepares the drawing inputs of the ith frame, see `Baseplot.get_frame`.
+        Adds the line annotation texts.
+
+        Parameters
+        ----------
+        i : int
+            Animation frame index
+
+        Returns
+        -------
+        SimpleNamespace
+            i, texts, line_attr, line_annots (dict of column to annotation text)
+        """
+        frame = super().get_frame(i)
+        frame.line_attr = self.get_ith_line_attrs(i)
+        frame.line_annots = (
+            self._frame_labels(
+                "line_annots", i, lambda: self._format_line_annots(i, frame.line_attr)
+            )
+            if self.line_annots
+            else {}
+        )
+        return frame
+
+    def get_ith_line_attrs(self, i: int) -> SimpleNamespace:
+        """Prepares the variables of the ith frame (see `BaseDatafier.add_var`).
+        Available as `self.line_attr` in `post_update`.
+
+        Parameters
+        ----------
+        i : int
+            Animation frame index
+
+        Returns
+        -------
+        SimpleNamespace
+            row_vars (row variables of the frame) and col_vars (column variables
+            aligned with the datafier columns)
+        """
+        return SimpleNamespace(
+            row_vars={name: values[i] for name, values in self.dfr.row_vars.items()},
+            col_vars=self.dfr.col_vars,
+        )
+
+    def _format_line_annots(self, i: int, line_attr: SimpleNamespace) -> dict:
+        callback = self.line_annot_props["callback"]
+        with_vars = self.line_annot_props["with_vars"]
+        columns = self.dfr.data.columns
+        values = self._get_line_data().y[i]
+        if self.line_annot_props["batch"]:
+            args = (line_attr.row_vars, line_attr.col_vars) if with_vars else ()
+            texts = callback(columns.to_numpy(), values, *args)
+        elif with_vars:
+            texts = [
+                callback(
+                    col,
+                    val,
+                    line_attr.row_vars,
+                    {name: v[n] for name, v in line_attr.col_vars.items()},
+                )
+                for n, (col, val) in enumerate(zip(columns, values))
+            ]
+        else:
+            texts = [callback(col, val) for col, val in zip(columns, values)]
+        return dict(zip(columns, texts))
+
+    def frame_inputs(self, frame: SimpleNamespace) -> dict:
+        """Returns the per-frame drawing inputs of a prepared frame, see
+        `Baseplot.frame_inputs`. The lines draw the history up to the frame, so the
+        frame index is always an input.
+
+        Parameters
+        ----------
+        frame : SimpleNamespace
+            Output of `get_frame`
+
+        Returns
+        -------
+        dict
+            The drawing inputs
+        """
+        return {**super().frame_inputs(frame), "i": frame.i}
+
+    def update(self, i: int, frame: SimpleNamespace = None) -> None:
+        """FuncAnimation update
+
+        Parameters
+        ----------
+        i : int
+            Animation frame
+        frame : SimpleNamespace, optional
+            Drawing inputs prepared by `get_frame(i)`, by default None
+        """
+        if frame is None:
+            frame = self.get_frame(i)
+        self._clear_frame()
+        self.line_attr = frame.line_attr
+        if self.line_backend == "collection":
+            self._update_line_collections(i)
+            data = self._get_line_data()
+            if self.line_annots:
+                for n, col in enumerate(self.dfr.data.columns):
+                    self.annot = self._text_pool.annotate(
+                        ("line_annot", col),
+                        frame.line_annots[col],
+                        (data.x[i], data.y[i, n]),
+                        **self.line_annot_props["kwargs"],
+                    )
+            super().update(i, frame)
+            return
+
+        data = self._get_line_data()
+        lines = self._get_lines(i)
+        first = self._first_row(i)
+        for n, col in enumerate(self.dfr.data.columns):
             self.ax.plot(
-                self.X[: i + 1],
-                self.Y[: i + 1],
-                color=self.column_colors[col],
-                linestyle=self.column_linestyles[col],
+                *lines[n].T,
+                color=data.colors[n],
+                linestyle=data.linestyles[n],
                 label=col,
                 **self.line_props,
             )
             if self.scatter_markers:
                 self.ax.scatter(
-                    self.X[:i],
-                    self.Y_og[:i],
-                    color=self.column_colors[col],
+                    data.x[first:i],
+                    data.y_og[first:i, n],
+                    color=data.colors[n],
                     **self.marker_props,
                 )
 
             if self.line_annots:
-                self.annot = self.ax.annotate(
-                    self.line_annot_props["callback"](col, self.Y[i]),
-                    (mdates.date2num(self.X[i]), self.Y[i]),
+                self.annot = self._text_pool.annotate(
+                    ("line_annot", col),
+                    frame.line_annots[col],
+                    (data.x[i], data.y[i, n]),
                     **self.line_annot_props["kwargs"],
                 )
 
-            if self.legend:
-                self.ax.legend(**self.legend_props)
-
             if self.line_head:
                 self.ax.scatter(
-                    self.X[i : i + 1],
-                    self.Y[i : i + 1],
-                    color=self.column_colors[col],
+                    data.x[i : i + 1],
+                    data.y[i : i + 1, n],
+                    color=data.colors[n],
                     **self.line_head_props,
                 )
-        super().update(i)
+        if self.legend:
+            self.ax.legend(**self.legend_props)
+        if self.window is not None:
+            self._set_window_lims(i)
+        super().update(i, frame)
@@ -0,0 +1,177 @@
+from collections import deque
+
+import numpy as np
+
+
+class LineDecimator:
+    def __init__(
+        self, x: np.ndarray, y: np.ndarray, bucket_size: int, method: str = "minmax"
+    ) -> None:
+        """Downsamples the history of every line to a fixed number of points per
+        bucket of rows, where a bucket is the rows falling into one pixel column.
+        "minmax" keeps the first, minimum, maximum and last point of every bucket,
+        "lttb" keeps one point per bucket with the Largest Triangle Three Buckets
+        algorithm. Buckets are decimated once they are complete and cached, rows
+        after the last complete bucket are returned as they are, so the cost of a
+        frame is bounded by the number of buckets and the bucket size.
+
+        Parameters
+        ----------
+        x : np.ndarray
+            X values of the rows, shape (rows,)
+        y : np.ndarray
+            Y values of every line, shape (rows, lines)
+        bucket_size : int
+            Number of rows per bucket
+        method : str, optional
+            "minmax" or "lttb", by default "minmax"
+        """
+        assert method in ("minmax", "lttb"), f"Unknown LOD method {method}"
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.bucket_size = max(1, int(bucket_size))
+        self.method = method
+        # rows before the first bucket, lttb always keeps the first row
+        self.start = 1 if method == "lttb" else 0
+        self.points_per_bucket = 4 if method == "minmax" else 1
+        self.n_buckets = 0
+        self.points = np.empty((self.y.shape[1], 0, 2))
+        self._rows = np.empty((0, self.y.shape[1]), dtype=int)
+
+    def _complete_buckets(self, i: int) -> int:
+        k = self.bucket_size
+        if self.method == "minmax":
+            return (i + 1 - self.start) // k
+        # lttb needs the next bucket to select a point
+        return max(0, (i + 1 - self.start) // k - 1)
+
+    def _minmax(self, first: int, last: int) -> np.ndarray:
+        k = self.bucket_size
+        start = self.start + first * k
+        y = self.y[start : self.start + last * k].reshape(last - first, k, -1)
+        lo = np.where(np.isnan(y), np.inf, y).argmin(axis=1)
+        hi = np.where(np.isnan(y), -np.inf, y).argmax(axis=1)
+        edges = np.broadcast_to(
+            np.array([0, k - 1])[None, :, None], (len(y), 2, y.shape[2])
+        )
+        offsets = np.sort(
+            np.concatenate([edges, lo[:, None], hi[:, None]], axis=1), axis=1
+        )
+        rows = start + k * np.arange(len(y))[:, None, None] + offsets
+        return rows.reshape(-1, y.shape[2])
+
+    def _lttb(self, first: int, last: int) -> np.ndarray:
+        k = self.bucket_size
+        cols = np.arange(self.y.shape[1])
+        prev = self._rows[-1] if len(self._rows) else np.zeros(len(cols), dtype=int)
+        rows = []
+        for b in range(first, last):
+            start = self.start + b * k
+            xb, yb = self.x[start : start + k], self.y[start : start + k]
+            cx = self.x[start + k : start + 2 * k].mean()
+            cy = np.nanmean(self.y[start + k : start + 2 * k], axis=0)
+            ax, ay = self.x[prev], self.y[prev, cols]
+            area = np.abs((ax - cx) * (yb - ay) - (ax - xb[:, None]) * (cy - ay))
+            prev = start + np.nan_to_num(area, nan=-1.0).argmax(axis=0)
+            rows.append(prev)
+        return np.array(rows, dtype=int).reshape(-1, len(cols))
+
+    def _select(self, rows: np.ndarray) -> np.ndarray:
+        cols = np.arange(self.y.shape[1])
+        return np.stack([self.x[rows].T, self.y[rows, cols].T], axis=-1)
+
+    def get(self, i: int) -> np.ndarray:
+        """Returns the decimated lines up to row `i` (included)
+
+        Parameters
+        ----------
+        i : int
+            Last row
+
+        Returns
+        -------
+        np.ndarray
+            Points of every line, shape (lines, points, 2)
+        """
+        n_buckets = self._complete_buckets(i)
+        if n_buckets < self.n_buckets:
+            self._rows = self._rows[: n_buckets * self.points_per_bucket]
+            self.points = self.points[:, : n_buckets * self.points_per_bucket]
+        elif n_buckets > self.n_buckets:
+            decimate = self._minmax if self.method == "minmax" else self._lttb
+            rows = decimate(self.n_buckets, n_buckets)
+            self._rows = np.concatenate([self._rows, rows])
+            self.points = np.concatenate([self.points, self._select(rows)], axis=1)
+        self.n_buckets = n_buckets
+
+        tail = np.arange(self.start + n_buckets * self.bucket_size, i + 1)
+        head = np.arange(self.start)
+        cols = self.y.shape[1]
+        return np.concatenate(
+            [
+                self._select(np.repeat(head[:, None], cols, axis=1)),
+                self.points,
+                self._select(np.repeat(tail[:, None], cols, axis=1)),
+            ],
+            axis=1,
+        )
+
+
+class SlidingExtrema:
+    def __init__(self, low: np.ndarray, high: np.ndarray, window: int) -> None:
+        """Minimum of `low` and maximum of `high` over a sliding window of rows,
+        kept in monotonic deques. Advancing the window by one row pushes the
+        entering row and pops the leaving one, in amortized O(1). NaNs are ignored.
+
+        Parameters
+        ----------
+        low : np.ndarray
+            Row minimums, shape (rows,)
+        high : np.ndarray
+            Row maximums, shape (rows,)
+        window : int
+            Number of rows in the window
+        """
+        self.low = np.where(np.isnan(low), np.inf, low)
+        self.high = np.where(np.isnan(high), -np.inf, high)
+        self.window = max(1, int(window))
+        self._reset(-1)
+
+    def _reset(self, last: int) -> None:
+        self.last = last
+        self._min = deque()
+        self._max = deque()
+
+    def _push(self, row: int) -> None:
+        while self._min and self.low[self._min[-1]] >= self.low[row]:
+            self._min.pop()
+        self._min.append(row)
+        while self._max and self.high[self._max[-1]] <= self.high[row]:
+            self._max.pop()
+        self._max.append(row)
+
+    def get(self, i: int) -> tuple[float, float]:
+        """Returns the extrema of the rows `[i - window + 1, i]`
+
+        Parameters
+        ----------
+        i : int
+            Last row of the window
+
+        Returns
+        -------
+        tuple[float, float]
+            Minimum and maximum, infinite if every value is NaN
+        """
+        first = max(0, i - self.window + 1)
+        if i < self.last or first > self.last:
+            # moved backwards or jumped past the window
+            self._reset(first - 1)
+        for row in range(self.last + 1, i + 1):
+            self._push(row)
+        self.last = i
+        while self._min[0] < first:
+            self._min.popleft()
+        while self._max[0] < first:
+            self._max.popleft()
+        return self.low[self._min[0]], self.high[self._max[0]]
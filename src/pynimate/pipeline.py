@@ -0,0 +1,131 @@
+import queue
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Iterable
+
+_DONE = object()
+
+
+class _Pipeline:
+    def __init__(self, queue_size: int) -> None:
+        self.prepared = queue.Queue(queue_size)
+        self.drawn = queue.Queue(queue_size)
+        self.stop = threading.Event()
+        self.busy = {"prepare": 0.0, "draw": 0.0, "encode": 0.0}
+        self.errors = []
+
+    def put(self, q: queue.Queue, item) -> bool:
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def get(self, q: queue.Queue):
+        while not self.stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return _DONE
+
+    def timed(self, stage: str, func: Callable, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self.busy[stage] += time.perf_counter() - start
+        return result
+
+    def fail(self, err: BaseException) -> None:
+        self.errors.append(err)
+        self.stop.set()
+
+
+def run_pipeline(
+    items: Iterable,
+    prepare: Callable[[Any], Any],
+    draw: Callable[[Any, Any], Any],
+    encode: Callable[[Any], None],
+    queue_size: int = 8,
+) -> SimpleNamespace:
+    """Runs a three stage render pipeline. `prepare` runs on a prefetching thread,
+    `draw` runs on the calling thread and `encode` on an encoder thread, stages are
+    connected by bounded queues. The output of `draw` must stay valid after the
+    next draw (ie. a copy of the Agg buffer).
+
+    Parameters
+    ----------
+    items : Iterable
+        Frames to render
+    prepare : Callable[[Any], Any]
+        Frame data preparation, called with the frame
+    draw : Callable[[Any, Any], Any]
+        Drawing stage, called with the frame and its prepared data
+    encode : Callable[[Any], None]
+        Encoding stage, called with the drawn output
+    queue_size : int, optional
+        Maximum number of frames waiting between two stages, by default 8
+
+    Returns
+    -------
+    SimpleNamespace
+        frames, wall_time, busy (seconds per stage), utilisation (busy / wall_time
+        per stage) and bottleneck (the most utilised stage)
+    """
+    pipe = _Pipeline(queue_size)
+    n_frames = [0]
+
+    def prepare_stage():
+        try:
+            for item in items:
+                data = pipe.timed("prepare", prepare, item)
+                if not pipe.put(pipe.prepared, (item, data)):
+                    return
+        except BaseException as err:
+            pipe.fail(err)
+        finally:
+            pipe.put(pipe.prepared, _DONE)
+
+    def encode_stage():
+        try:
+            while (drawn := pipe.get(pipe.drawn)) is not _DONE:
+                pipe.timed("encode", encode, drawn)
+                n_frames[0] += 1
+        except BaseException as err:
+            pipe.fail(err)
+
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=prepare_stage, daemon=True),
+        threading.Thread(target=encode_stage, daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        while (prepared := pipe.get(pipe.prepared)) is not _DONE:
+            drawn = pipe.timed("draw", draw, *prepared)
+            if not pipe.put(pipe.drawn, drawn):
+                break
+    except BaseException as err:
+        pipe.fail(err)
+    finally:
+        pipe.put(pipe.drawn, _DONE)
+        for thread in threads:
+            thread.join()
+    if pipe.errors:
+        raise pipe.errors[0]
+
+    wall_time = time.perf_counter() - start
+    utilisation = {
+        stage: busy / wall_time if wall_time else 0.0
+        for stage, busy in pipe.busy.items()
+    }
+    return SimpleNamespace(
+        frames=n_frames[0],
+        wall_time=wall_time,
+        busy=pipe.busy,
+        utilisation=utilisation,
+        bottleneck=max(utilisation, key=utilisation.get),
+    )
@@ -0,0 +1,276 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from itertools import zip_longest
+from types import SimpleNamespace
+
+import matplotlib as mpl
+import numpy as np
+
+from pynimate.writers import PILLOW_EXTENSIONS, PNG_PATTERN, get_writer, read_frames
+
+
+class SegmentManifest:
+    def __init__(
+        self,
+        fps: float,
+        n_frames: int,
+        segments: list[dict] = None,
+        path: str = None,
+        config_hash: str = None,
+    ) -> None:
+        """Describes an animation split into independently rendered segments.
+        Every segment covers the frames `[start, stop)` and is written to its own
+        file (or png sequence directory), see `Canvas.plan_segments`.
+
+        Parameters
+        ----------
+        fps : float
+            Frames per second of the animation
+        n_frames : int
+            Total number of frames of the animation
+        segments : list[dict], optional
+            List of `{"start": int, "stop": int, "path": str}` dicts, by default None
+        path : str, optional
+            Location of the manifest json file, by default None
+        config_hash : str, optional
+            Hash of the canvas configuration the segments were rendered with,
+            by default None
+        """
+        self.fps = fps
+        self.n_frames = n_frames
+        self.segments = [SimpleNamespace(**seg) for seg in segments or []]
+        self.path = path
+        self.config_hash = config_hash
+
+    @classmethod
+    def load(cls, path: str) -> "SegmentManifest":
+        """Loads a manifest json file
+
+        Parameters
+        ----------
+        path : str
+            Manifest path
+
+        Returns
+        -------
+        SegmentManifest
+            The loaded manifest
+        """
+        with open(path) as f:
+            content = json.load(f)
+        return cls(
+            content["fps"],
+            content["n_frames"],
+            content["segments"],
+            path,
+            content.get("config_hash"),
+        )
+
+    def save(self, path: str = None) -> None:
+        """Writes the manifest as json
+
+        Parameters
+        ----------
+        path : str, optional
+            Manifest path, by default the path it was loaded from
+        """
+        self.path = path or self.path
+        assert self.path is not None, "Manifest path is not set"
+        content = {
+            "fps": self.fps,
+            "n_frames": self.n_frames,
+            "config_hash": self.config_hash,
+            "segments": [vars(seg) for seg in self.segments],
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(content, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def add(self, start: int, stop: int, path: str) -> SimpleNamespace:
+        """Adds a segment covering frames `[start, stop)`
+
+        Parameters
+        ----------
+        start : int
+            First frame of the segment
+        stop : int
+            End frame of the segment (exclusive)
+        path : str
+            Segment output path
+
+        Returns
+        -------
+        SimpleNamespace
+            The segment
+        """
+        assert 0 <= start < stop <= self.n_frames, f"Invalid range [{start}, {stop})"
+        segment = SimpleNamespace(start=start, stop=stop, path=path)
+        self.segments.append(segment)
+        self.segments.sort(key=lambda seg: seg.start)
+        return segment
+
+    def resolve(self, path: str) -> str:
+        """Resolves segment paths relative to the manifest location"""
+        if self.path is None or os.path.isabs(path):
+            return path
+        return os.path.join(os.path.dirname(os.path.abspath(self.path)), path)
+
+    def is_complete(self, segment: SimpleNamespace) -> bool:
+        """Checks that a segment was fully written, ie. it is marked done in the
+        journal and its output still has the recorded size.
+
+        Parameters
+        ----------
+        segment : SimpleNamespace
+            The segment
+
+        Returns
+        -------
+        bool
+            True if the segment does not need to be rendered again
+        """
+        path = self.resolve(segment.path)
+        return (
+            getattr(segment, "done", False)
+            and os.path.exists(path)
+            and _output_size(path) == segment.bytes
+        )
+
+    def mark_done(self, segment: SimpleNamespace) -> None:
+        """Marks a segment as written and saves the manifest
+
+        Parameters
+        ----------
+        segment : SimpleNamespace
+            The segment
+        """
+        segment.done = True
+        segment.bytes = _output_size(self.resolve(segment.path))
+        if self.path is not None:
+            self.save()
+
+    def validate(self) -> None:
+        """Checks that the segments are contiguous and cover every frame"""
+        expected = 0
+        for seg in self.segments:
+            if seg.start != expected:
+                raise ValueError(
+                    f"Segments are not contiguous, expected a segment starting at frame {expected}"
+                )
+            expected = seg.stop
+        if expected != self.n_frames:
+            raise ValueError(
+                f"Segments cover {expected} frames, expected {self.n_frames}"
+            )
+
+
+def _output_size(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(entry.stat().st_size for entry in os.scandir(path))
+    return os.path.getsize(path)
+
+
+def concat(
+    manifest: SegmentManifest,
+    output: str,
+    reference: str = None,
+    tolerance: float = 0,
+) -> None:
+    """Stitches the segments of a manifest into a single output. Video segments are
+    joined with the ffmpeg concat demuxer without re-encoding, png sequences are
+    renumbered and gif / webp segments are re-assembled frame by frame.
+
+    Parameters
+    ----------
+    manifest : SegmentManifest
+        Manifest describing the segments
+    output : str
+        Output path, must have the same format as the segments
+    reference : str, optional
+        Single-node render to check the stitched output against, by default None
+    tolerance : float, optional
+        Pixel tolerance of the reference check, see `compare_outputs`, by default 0
+    """
+    manifest.validate()
+    paths = [manifest.resolve(seg.path) for seg in manifest.segments]
+    for path in paths:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Segment {path} has not been rendered")
+
+    extension = os.path.splitext(output)[1][1:].lower()
+    if extension == "":
+        os.makedirs(output, exist_ok=True)
+        n = 0
+        for path in paths:
+            for name in sorted(f for f in os.listdir(path) if f.endswith(".png")):
+                shutil.copyfile(
+                    os.path.join(path, name),
+                    os.path.join(output, PNG_PATTERN.format(n)),
+                )
+                n += 1
+    elif extension in PILLOW_EXTENSIONS:
+        with get_writer(output, manifest.fps) as writer:
+            for path in paths:
+                for frame in read_frames(path, manifest.fps):
+                    writer.write(frame)
+    else:
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+            for path in paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        try:
+            subprocess.run(
+                [
+                    mpl.rcParams["animation.ffmpeg_path"],
+                    "-y",
+                    "-loglevel",
+                    "error",
+                    "-f",
+                    "concat",
+                    "-safe",
+                    "0",
+                    "-i",
+                    f.name,
+                    "-c",
+                    "copy",
+                    output,
+                ],
+                check=True,
+            )
+        finally:
+            os.remove(f.name)
+
+    if reference is not None and not compare_outputs(output, reference, tolerance):
+        raise ValueError(f"Stitched output {output} does not match {reference}")
+
+
+def compare_outputs(path: str, reference: str, tolerance: float = 0) -> bool:
+    """Checks that two rendered outputs decode to the same frames, e.g. a stitched
+    output against a single-node render.
+
+    Parameters
+    ----------
+    path : str
+        Output to check
+    reference : str
+        Reference output
+    tolerance : float, optional
+        Maximum allowed absolute pixel difference, use a small positive value
+        for lossy codecs, by default 0
+
+    Returns
+    -------
+    bool
+        True if both outputs have the same number of frames and every frame matches
+    """
+    for frame, ref_frame in zip_longest(read_frames(path), read_frames(reference)):
+        if frame is None or ref_frame is None or frame.shape != ref_frame.shape:
+            return False
+        diff = np.abs(frame.astype(np.int16) - ref_frame.astype(np.int16)).max()
+        if diff > tolerance:
+            return False
+    return True
@@ -0,0 +1,166 @@
+import sys
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+def _create_block(arr: np.ndarray) -> tuple[shared_memory.SharedMemory, dict]:
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, arr.dtype, buffer=shm.buf)[...] = arr
+    return shm, {"name": shm.name, "shape": arr.shape, "dtype": arr.dtype.str}
+
+
+def _tracker_pid():
+    return getattr(resource_tracker._resource_tracker, "_pid", None)
+
+
+def _attach_block(
+    meta: dict, owner_tracker_pid: int
+) -> tuple[shared_memory.SharedMemory, np.ndarray]:
+    if sys.version_info >= (3, 13):
+        shm = shared_memory.SharedMemory(name=meta["name"], track=False)
+    else:
+        shm = shared_memory.SharedMemory(name=meta["name"])
+        # a process with its own resource tracker would unlink the block on exit,
+        # the publishing process owns it, see https://bugs.python.org/issue39959
+        pid = _tracker_pid()
+        if pid is not None and pid != owner_tracker_pid:
+            resource_tracker.unregister(shm._name, "shared_memory")
+    arr = np.ndarray(meta["shape"], np.dtype(meta["dtype"]), buffer=shm.buf)
+    arr.flags.writeable = False
+    return shm, arr
+
+
+def _is_shareable_frame(frame: pd.DataFrame) -> bool:
+    return (
+        len(frame.columns) > 0
+        and frame.dtypes.nunique() == 1
+        and frame.dtypes.iloc[0].kind in "biuf"
+    )
+
+
+class SharedDatafier:
+    def __init__(self, datafier) -> None:
+        """Publishes the numeric arrays of a datafier in shared memory. The handle is
+        cheap to pickle, worker processes call `attach` to get a datafier whose
+        DataFrames are read-only views on the shared blocks, without copying.
+
+        Numeric DataFrames (data, df_ranks, expanded, ...) and numeric ndarrays are
+        shared, every other attribute is pickled with the handle. Timezone-naive
+        DatetimeIndexes are shared once and reused by all the frames that use them.
+
+        The publishing process owns the blocks and must call `unlink` once the
+        workers are done (or use the handle as a context manager).
+
+        Parameters
+        ----------
+        datafier : BaseDatafier
+            The datafier to publish
+        """
+        self.datafier_cls = type(datafier)
+        self.frames = {}
+        self.arrays = {}
+        self.indexes = []
+        self.attrs = {}
+        self._blocks = []
+        self._attached = None
+
+        published = {}
+        for key, value in vars(datafier).items():
+            if id(value) in published:
+                self.frames[key] = published[id(value)]
+            elif isinstance(value, pd.DataFrame) and _is_shareable_frame(value):
+                self.frames[key] = published[id(value)] = self._publish_frame(value)
+            elif isinstance(value, np.ndarray) and value.dtype.kind in "biufmM":
+                self.arrays[key] = self._publish(value)
+            else:
+                self.attrs[key] = value
+        self.tracker_pid = _tracker_pid()
+
+    def _publish(self, arr: np.ndarray) -> dict:
+        shm, meta = _create_block(np.ascontiguousarray(arr))
+        self._blocks.append(shm)
+        return meta
+
+    def _publish_index(self, index: pd.Index):
+        if not isinstance(index, pd.DatetimeIndex) or index.tz is not None:
+            return index
+        for n, (published, _) in enumerate(self.indexes):
+            if published.equals(index):
+                return n
+        self.indexes.append((index, self._publish(index.values)))
+        return len(self.indexes) - 1
+
+    def _publish_frame(self, frame: pd.DataFrame) -> dict:
+        return {
+            "values": self._publish(frame.to_numpy()),
+            "index": self._publish_index(frame.index),
+            "index_name": frame.index.name,
+            "columns": frame.columns,
+        }
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["indexes"] = [(None, meta) for _, meta in self.indexes]
+        state["_blocks"] = []
+        state["_attached"] = None
+        return state
+
+    def attach(self):
+        """Attaches to the shared blocks and rebuilds the datafier. Repeated calls in
+        the same process return the same datafier.
+
+        Returns
+        -------
+        BaseDatafier
+            Datafier backed by read-only shared memory views
+        """
+        if self._attached is not None:
+            return self._attached
+
+        blocks = []
+
+        def view(meta: dict) -> np.ndarray:
+            shm, arr = _attach_block(meta, self.tracker_pid)
+            blocks.append(shm)
+            return arr
+
+        indexes = [pd.DatetimeIndex(view(meta), copy=False) for _, meta in self.indexes]
+        datafier = self.datafier_cls.__new__(self.datafier_cls)
+        datafier.__dict__.update(self.attrs)
+        for key, meta in self.arrays.items():
+            setattr(datafier, key, view(meta))
+        frames = {}
+        for key, meta in self.frames.items():
+            if id(meta) not in frames:
+                index = meta["index"]
+                index = indexes[index] if isinstance(index, int) else index
+                frames[id(meta)] = pd.DataFrame(
+                    view(meta["values"]),
+                    index=index.rename(meta["index_name"]),
+                    columns=meta["columns"],
+                    copy=False,
+                )
+            setattr(datafier, key, frames[id(meta)])
+        datafier._shared_blocks = blocks
+        self._attached = datafier
+        return datafier
+
+    def close(self) -> None:
+        """Closes the blocks in this process"""
+        for shm in self._blocks:
+            shm.close()
+
+    def unlink(self) -> None:
+        """Closes and frees the shared blocks, only call it in the publishing process"""
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+
+    def __enter__(self) -> "SharedDatafier":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.unlink()
@@ -0,0 +1,268 @@
+import functools
+import hashlib
+import importlib
+import types
+
+import numpy as np
+import pandas as pd
+
+from pynimate.shared import SharedDatafier
+
+
+class CallableRef:
+    def __init__(self, name: str) -> None:
+        """Reference to an importable callable in the form `module:qualname`.
+
+        Parameters
+        ----------
+        name : str
+            Qualified name, ie. `pynimate.utils:human_readable`
+        """
+        self.name = name
+
+    @classmethod
+    def from_callable(cls, func) -> "CallableRef":
+        """Creates a reference to a module level function or class
+
+        Parameters
+        ----------
+        func : Callable
+            The function to reference
+
+        Returns
+        -------
+        CallableRef
+            Reference to `func`
+        """
+        qualname = getattr(func, "__qualname__", "")
+        if "<lambda>" in qualname or "<locals>" in qualname or not func.__module__:
+            raise ValueError(
+                f"Callback {qualname or func!r} cannot be referenced by name, "
+                "define it as a module level function"
+            )
+        return cls(f"{func.__module__}:{qualname}")
+
+    def resolve(self):
+        """Imports the referenced callable
+
+        Returns
+        -------
+        Callable
+            The referenced callable
+        """
+        module, qualname = self.name.split(":")
+        obj = importlib.import_module(module)
+        for attr in qualname.split("."):
+            obj = getattr(obj, attr)
+        return obj
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CallableRef) and self.name == other.name
+
+    def __repr__(self) -> str:
+        return f"CallableRef({self.name!r})"
+
+
+def plot_state(plot) -> dict:
+    """Returns the configuration attributes of a plot, leaving out the attributes
+    listed in `plot._runtime_attrs` and private attributes, which hold matplotlib
+    state or values derived from the configuration.
+
+    Parameters
+    ----------
+    plot : Plot_like
+        Plot instance (Baseplot subclass)
+
+    Returns
+    -------
+    dict
+        Attribute name to value mapping
+    """
+    return {
+        k: v
+        for k, v in vars(plot).items()
+        if k not in plot._runtime_attrs and not k.startswith("_")
+    }
+
+
+def _encode(value):
+    if isinstance(value, (types.FunctionType, types.BuiltinFunctionType, type)):
+        return CallableRef.from_callable(value)
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_encode(v) for v in value)
+    return value
+
+
+def _decode(value):
+    if isinstance(value, CallableRef):
+        return value.resolve()
+    if isinstance(value, dict):
+        return {k: _decode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_decode(v) for v in value)
+    return value
+
+
+class PlotSpec:
+    def __init__(self, plot_cls: CallableRef, datafier, state: dict) -> None:
+        """Picklable description of a plot. It holds the datafier, the decorations
+        and callback references separately from the matplotlib artists, so plots
+        can be shipped to worker processes and rebuilt there with `build`.
+
+        Parameters
+        ----------
+        plot_cls : CallableRef
+            Reference to the plot class
+        datafier : Union[BaseDatafier, SharedDatafier]
+            The datafier instance or its shared memory handle
+        state : dict
+            Plot attributes, with callbacks replaced by `CallableRef`s
+        """
+        self.plot_cls = plot_cls
+        self.datafier = datafier
+        self.state = state
+
+    @classmethod
+    def from_plot(cls, plot, shared: SharedDatafier = None) -> "PlotSpec":
+        """Creates the spec of a plot
+
+        Parameters
+        ----------
+        plot : Plot_like
+            Plot instance (Baseplot subclass)
+        shared : SharedDatafier, optional
+            Shared memory handle of the plot's datafier, shipped instead of
+            the datafier, by default None
+
+        Returns
+        -------
+        PlotSpec
+            The plot spec
+        """
+        state = plot_state(plot)
+        del state["datafier"], state["dfr"]
+        return cls(
+            CallableRef.from_callable(type(plot)),
+            plot.datafier if shared is None else shared,
+            _encode(state),
+        )
+
+    def build(self, ax=None):
+        """Rebuilds the plot without recomputing the datafier or the decorations
+
+        Parameters
+        ----------
+        ax : plt.Axes, optional
+            Axes of the rebuilt plot, by default None
+
+        Returns
+        -------
+        Plot_like
+            The rebuilt plot
+        """
+        plot_cls = self.plot_cls.resolve()
+        plot = plot_cls.__new__(plot_cls)
+        plot.__dict__.update(_decode(self.state))
+        datafier = self.datafier
+        if isinstance(datafier, SharedDatafier):
+            datafier = datafier.attach()
+        plot.datafier = plot.dfr = datafier
+        plot._restore()
+        if ax is not None:
+            plot.set_axes(ax)
+        return plot
+
+
+def _cell_contents(cell):
+    try:
+        return cell.cell_contents
+    except ValueError:
+        # the closure variable is not assigned yet
+        return "<empty>"
+
+
+def _update_hash(h, value, seen: frozenset = frozenset()) -> None:
+    h.update(type(value).__name__.encode())
+    if id(value) in seen:
+        # ie. a plot holding one of its own bound methods
+        h.update(b"<cycle>")
+        return
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        if isinstance(value, pd.DataFrame):
+            _update_hash(h, list(value.columns), seen)
+        h.update(pd.util.hash_pandas_object(value).values.tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(f"{value.dtype}{value.shape}".encode())
+        if value.dtype.hasobject:
+            _update_hash(h, value.tolist(), seen)
+        else:
+            h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value, key=str):
+            _update_hash(h, key, seen)
+            _update_hash(h, value[key], seen)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = sorted(value, key=repr) if isinstance(value, (set, frozenset)) else value
+        for item in items:
+            _update_hash(h, item, seen)
+    elif isinstance(value, types.FunctionType):
+        # lambdas have no importable name, their bytecode identifies them instead
+        seen = seen | {id(value)}
+        h.update(f"{value.__module__}:{value.__qualname__}".encode())
+        _update_hash(h, value.__code__, seen)
+        _update_hash(h, value.__defaults__, seen)
+        _update_hash(h, value.__kwdefaults__, seen)
+        cells = value.__closure__ or ()
+        _update_hash(h, [_cell_contents(cell) for cell in cells], seen)
+        # globals the function reads, modules are left out as they rarely change
+        _update_hash(
+            h,
+            {
+                name: value.__globals__[name]
+                for name in value.__code__.co_names
+                if name in value.__globals__
+                and not isinstance(value.__globals__[name], types.ModuleType)
+            },
+            seen,
+        )
+    elif isinstance(value, types.MethodType):
+        seen = seen | {id(value)}
+        _update_hash(h, value.__func__, seen)
+        _update_hash(h, value.__self__, seen)
+    elif isinstance(value, functools.partial):
+        seen = seen | {id(value)}
+        _update_hash(h, value.func, seen)
+        _update_hash(h, value.args, seen)
+        _update_hash(h, value.keywords, seen)
+    elif isinstance(value, types.CodeType):
+        h.update(value.co_code)
+        _update_hash(h, value.co_names, seen)
+        _update_hash(h, value.co_consts, seen)
+    elif hasattr(value, "__dict__") and not isinstance(value, type):
+        state = plot_state(value) if hasattr(value, "_runtime_attrs") else vars(value)
+        _update_hash(
+            h,
+            {k: v for k, v in state.items() if k[0] != "_"},
+            seen | {id(value)},
+        )
+    else:
+        h.update(repr(value).encode())
+
+
+def config_hash(*values) -> str:
+    """Hashes plot configurations, ie. plots, datafiers, decorations and callbacks.
+    Runtime state of plots (see `plot_state`) and private attributes of other
+    objects are ignored. Callbacks are hashed with their defaults, closures and
+    the non-module globals they read.
+
+    Returns
+    -------
+    str
+        Hex digest of the configuration
+    """
+    h = hashlib.sha256()
+    for value in values:
+        _update_hash(h, plot_state(value) if hasattr(value, "_runtime_attrs") else value)
+    return h.hexdigest()
@@ -0,0 +1,300 @@
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+import matplotlib.transforms as mtransforms
+import numpy as np
+from matplotlib.artist import Artist
+from matplotlib.text import Annotation, Text
+
+_LAYOUT_CACHE_SIZE = 4096
+_layout_cache = OrderedDict()
+
+
+class _CachedLayout:
+    # Text._get_layout does not depend on the text position, only on the string,
+    # font and alignment, so texts repeating across frames share their layout
+    def _get_layout(self, renderer):
+        try:
+            key = (
+                self._get_wrapped_text(),
+                hash(self._fontproperties),
+                self.get_usetex(),
+                self.get_parse_math(),
+                self.figure.dpi,
+                self._linespacing,
+                self.get_rotation(),
+                self.get_rotation_mode(),
+                self._get_multialignment(),
+                self.get_horizontalalignment(),
+                self.get_verticalalignment(),
+                type(renderer),
+            )
+        except AttributeError:
+            # matplotlib versions without these internals are not cached
+            return super()._get_layout(renderer)
+        layout = _layout_cache.get(key)
+        if layout is None:
+            layout = _layout_cache[key] = super()._get_layout(renderer)
+            if len(_layout_cache) > _LAYOUT_CACHE_SIZE:
+                _layout_cache.popitem(last=False)
+        else:
+            _layout_cache.move_to_end(key)
+        return layout
+
+
+class PooledText(_CachedLayout, Text):
+    pass
+
+
+class PooledAnnotation(_CachedLayout, Annotation):
+    pass
+
+
+class TextBatch(Artist):
+    def __init__(self, **kwargs) -> None:
+        """Draws many texts sharing the same properties through a single artist.
+        The positions are transformed at once and one text artist is drawn at every
+        position, texts repeating across frames reuse their cached layout.
+        Additional kwargs are passed to `Text(**kwargs)`.
+        """
+        super().__init__()
+        self._text = PooledText(
+            0,
+            0,
+            "",
+            **{
+                "verticalalignment": "baseline",
+                "horizontalalignment": "left",
+                "clip_on": False,
+                **kwargs,
+            },
+        )
+        self._text.set_transform(mtransforms.IdentityTransform())
+        self.set_zorder(self._text.get_zorder())
+        self._offsets = np.empty((0, 2))
+        self._strings = []
+
+    def set_figure(self, fig) -> None:
+        super().set_figure(fig)
+        self._text.set_figure(fig)
+
+    def set_data(self, x: np.ndarray, y: np.ndarray, strings: list) -> None:
+        """Sets the text positions (in the coordinates of the artist transform)
+        and strings
+
+        Parameters
+        ----------
+        x : np.ndarray
+            X coordinates
+        y : np.ndarray
+            Y coordinates
+        strings : list
+            The texts
+        """
+        self._offsets = np.column_stack([x, y]).astype(float)
+        self._strings = list(strings)
+        self.stale = True
+
+    def get_texts(self) -> list[str]:
+        """Returns the texts as strings"""
+        return [str(s) for s in self._strings]
+
+    def draw(self, renderer) -> None:
+        if not self.get_visible():
+            return
+        positions = self.get_transform().transform(self._offsets)
+        for position, s in zip(positions, self._strings):
+            self._text.set_position(position)
+            self._text.set_text(s)
+            self._text.draw(renderer)
+        self.stale = False
+
+
+class TextPool:
+    def __init__(self, ax: plt.Axes) -> None:
+        """Keeps the text artists of a plot alive across frames. Texts are identified
+        by a key, the first request creates the artist and later requests only
+        update its string and position. `begin` detaches every pooled text from the
+        axes at the start of a frame, requested texts are attached again in request
+        order, so the drawing order matches freshly created texts. Layouts of
+        repeated strings are cached.
+
+        Parameters
+        ----------
+        ax : plt.Axes
+            Axes of the texts
+        """
+        self.ax = ax
+        self.artists = {}
+        self._props = {}
+        self._attached = set()
+
+    def _reuse(self, key, kwargs: dict):
+        artist = self.artists.get(key)
+        if artist is None:
+            return None
+        if self._props[key] != kwargs:
+            if key in self._attached:
+                artist.remove()
+                self._attached.discard(key)
+            return None
+        if key not in self._attached:
+            attach_artist(self.ax, artist)
+            self._attached.add(key)
+        return artist
+
+    def _add(self, key, artist: Text, kwargs: dict) -> Text:
+        self.artists[key] = artist
+        self._props[key] = kwargs
+        attach_artist(self.ax, artist)
+        self._attached.add(key)
+        return artist
+
+    def text(self, key, x: float, y: float, s: str, **kwargs) -> Text:
+        """Returns the text of `key` at (x, y), same defaults as `ax.text(**kwargs)`
+
+        Parameters
+        ----------
+        key : Hashable
+            Text identifier
+        x : float
+            X coordinate
+        y : float
+            Y coordinate
+        s : str
+            The text
+
+        Returns
+        -------
+        Text
+            The pooled text artist
+        """
+        artist = self._reuse(key, kwargs)
+        if artist is not None:
+            # unchanged texts stay clean
+            artist.set_text(s)
+            if artist.get_position() != (x, y):
+                artist.set_position((x, y))
+            return artist
+
+        artist = PooledText(
+            x,
+            y,
+            text=s,
+            **{
+                "verticalalignment": "baseline",
+                "horizontalalignment": "left",
+                "transform": self.ax.transData,
+                "clip_on": False,
+                **kwargs,
+            },
+        )
+        artist.set_clip_path(self.ax.patch)
+        return self._add(key, artist, kwargs)
+
+    def annotate(self, key, s: str, xy: tuple[float, float], **kwargs) -> Annotation:
+        """Returns the annotation of `key` pointing at `xy`, same defaults as
+        `ax.annotate(**kwargs)`
+
+        Parameters
+        ----------
+        key : Hashable
+            Annotation identifier
+        s : str
+            The text
+        xy : tuple[float, float]
+            The annotated point
+
+        Returns
+        -------
+        Annotation
+            The pooled annotation artist
+        """
+        artist = self._reuse(key, kwargs)
+        if artist is not None:
+            artist.set_text(s)
+            artist.xy = xy
+            if "xytext" not in kwargs:
+                # the text is placed at xy itself, as in `ax.annotate`
+                artist.set_position(xy)
+            artist.stale = True
+            return artist
+
+        artist = PooledAnnotation(s, xy, **kwargs)
+        artist.set_transform(mtransforms.IdentityTransform())
+        if "clip_on" in kwargs:
+            artist.set_clip_path(self.ax.patch)
+        return self._add(key, artist, kwargs)
+
+    def batch(
+        self, key, x: np.ndarray, y: np.ndarray, strings: list, **kwargs
+    ) -> TextBatch:
+        """Returns the text batch of `key` drawing `strings` at (x, y) in data
+        coordinates, see `TextBatch`
+
+        Parameters
+        ----------
+        key : Hashable
+            Batch identifier
+        x : np.ndarray
+            X coordinates
+        y : np.ndarray
+            Y coordinates
+        strings : list
+            The texts
+
+        Returns
+        -------
+        TextBatch
+            The pooled text batch
+        """
+        artist = self._reuse(key, kwargs)
+        if artist is None:
+            artist = self._add(key, TextBatch(**kwargs), kwargs)
+        artist.set_data(x, y, strings)
+        return artist
+
+    def begin(self) -> None:
+        """Starts a frame, detaching the pooled texts from the axes"""
+        detach_artists(self.ax, self.artists.values())
+        self._attached = set()
+
+
+def attach_artist(ax: plt.Axes, artist: Artist) -> Artist:
+    """Adds an artist to the axes, keeping its clipping (unlike `ax.add_artist`).
+    Collections and patches are not added to the data limits.
+
+    Parameters
+    ----------
+    ax : plt.Axes
+        Axes of the artist
+    artist : Artist
+        Artist to attach
+
+    Returns
+    -------
+    Artist
+        The artist
+    """
+    clip_box, clip_path = artist.get_clip_box(), artist.get_clip_path()
+    ax.add_artist(artist)
+    artist.set_clip_box(clip_box)
+    artist.set_clip_path(clip_path)
+    return artist
+
+
+def detach_artists(ax: plt.Axes, artists) -> None:
+    """Takes pooled artists out of the axes without resetting them, they are
+    attached again with `attach_artist`.
+
+    Parameters
+    ----------
+    ax : plt.Axes
+        Axes of the artists
+    artists : Iterable[Artist]
+        Artists to detach
+    """
+    for artist in artists:
+        # the legend is held by `ax.legend_`, it is not redrawn out of order
+        if artist.axes is ax and artist is not ax.get_legend():
+            artist.remove()
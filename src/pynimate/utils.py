@@ -1,6 +1,7 @@
 from typing import Union
 
 import numpy as np
+import pandas as pd
 
 
 def human_readable(num: Union[float, int], precision: int = 2, *args) -> str:
@@ -20,10 +21,103 @@ def human_readable(num: Union[float, int], precision: int = 2, *args) -> str:
     str
         Human readable numeric string
     """
-    if num == np.nan:
+    if np.isnan(num):
         return ""
     magnitude = 0
     while abs(num) >= 1000:
         magnitude += 1
         num /= 1000.0
     return f'{np.round(num, precision)}{["", "K", "M", "B", "T", "Q"][magnitude]}'
+
+
+def human_readable_array(nums: np.ndarray, precision: int = 2) -> np.ndarray:
+    """Array version of `human_readable`, formats every value at once. The
+    magnitudes come from log10 instead of a division loop, so a whole frame or
+    the whole animation can be formatted up front. NaNs become empty strings.
+
+    Parameters
+    ----------
+    nums : np.ndarray
+        Numeric values, any shape
+    precision : int, optional
+        Rounding precision, by default 2
+
+    Returns
+    -------
+    np.ndarray
+        Human readable numeric strings, same shape as `nums`
+    """
+    nums = np.asarray(nums)
+    values = nums.astype(float)
+    finite = np.isfinite(values) & (values != 0)
+    log = np.log10(np.abs(values), where=finite, out=np.zeros_like(values))
+    magnitude = np.clip(np.floor(log / 3), 0, 5).astype(int)
+    # log10 can round up just below a power of 1000
+    magnitude -= (magnitude > 0) & (np.abs(values) < 1000.0**magnitude)
+    scaled = values
+    for k in range(magnitude.max(initial=0)):
+        # divides like `human_readable` does, so both round the same values
+        scaled = np.where(magnitude > k, scaled / 1000.0, scaled)
+    rounded = np.round(scaled, precision).astype(str)
+    if nums.dtype.kind in "iu":
+        rounded = np.where(magnitude == 0, nums.astype(str), rounded)
+    suffixes = np.array(["", "K", "M", "B", "T", "Q"])[magnitude]
+    return np.where(np.isnan(values), "", np.char.add(rounded, suffixes))
+
+
+def nice_steps(span: np.ndarray, n_ticks: int = 6) -> np.ndarray:
+    """Tick steps snapped to nice numbers (1, 2, 2.5 or 5 times a power of ten),
+    such that about `n_ticks` ticks cover `span`.
+
+    Parameters
+    ----------
+    span : np.ndarray
+        Axis spans (max - min)
+    n_ticks : int, optional
+        Approximate number of ticks, by default 6
+
+    Returns
+    -------
+    np.ndarray
+        Tick steps
+    """
+    raw = np.abs(np.asarray(span, dtype=float)) / max(n_ticks - 1, 1)
+    raw = np.where(raw > 0, raw, 1.0)
+    power = 10.0 ** np.floor(np.log10(raw))
+    nice = np.array([1, 2, 2.5, 5, 10])
+    fraction = raw / power
+    index = np.minimum(np.searchsorted(nice, fraction - 1e-9), len(nice) - 1)
+    return nice[index] * power
+
+
+def smooth_limits(
+    low: np.ndarray, high: np.ndarray, frames: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Smooths per-frame axis limits over `frames` frames without cutting off the
+    data: every limit is the average of the look-ahead extremes of the previous
+    frames, so the axis starts moving before the data reaches its edge and the
+    data of the current frame always stays inside.
+
+    Parameters
+    ----------
+    low : np.ndarray
+        Lower limit of every frame
+    high : np.ndarray
+        Upper limit of every frame
+    frames : int
+        Smoothing window in frames
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        Smoothed lower and upper limits
+    """
+    if frames <= 1:
+        return np.asarray(low, dtype=float), np.asarray(high, dtype=float)
+    low, high = pd.Series(low, dtype=float), pd.Series(high, dtype=float)
+    ahead_low = low[::-1].rolling(frames, min_periods=1).min()[::-1]
+    ahead_high = high[::-1].rolling(frames, min_periods=1).max()[::-1]
+    return (
+        ahead_low.rolling(frames, min_periods=1).mean().to_numpy(),
+        ahead_high.rolling(frames, min_periods=1).mean().to_numpy(),
+    )
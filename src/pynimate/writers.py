@@ -0,0 +1,548 @@
+import os
+import queue
+import shutil
+import subprocess
+import threading
+
+import matplotlib as mpl
+import numpy as np
+from PIL import Image
+
+VIDEO_EXTENSIONS = ("mp4", "mkv", "mov", "webm", "avi")
+PILLOW_EXTENSIONS = ("gif", "webp")
+IMAGE_EXTENSIONS = ("png", "jpg", "jpeg")
+PNG_PATTERN = "frame_{:06d}.png"
+
+
+class FrameWriter:
+    def __init__(self, path: str, fps: float) -> None:
+        """Base class of the frame writers. A frame writer encodes raw RGBA frames
+        (`(height, width, 4)` uint8 arrays) into a file or a directory.
+
+        Parameters
+        ----------
+        path : str
+            Output path
+        fps : float
+            Frames per second
+        """
+        self.path = path
+        self.fps = fps
+        self.size = None
+        self.channels = None
+        self.n_frames = 0
+        self._last = None
+
+    def setup(self, width: int, height: int) -> None:
+        """Prepares the writer, called with the size of the first frame.
+
+        Parameters
+        ----------
+        width : int
+            Frame width in pixels
+        height : int
+            Frame height in pixels
+        """
+        self.size = (width, height)
+
+    def write(self, frame: np.ndarray, duration: int = 1) -> None:
+        """Encodes a single RGBA frame. The frame is not copied, so views on the Agg
+        buffer can be passed directly. Only a reference to the last frame is kept
+        for `repeat`.
+
+        Parameters
+        ----------
+        frame : np.ndarray
+            RGBA frame of shape `(height, width, 4)`, or RGB frame of shape
+            `(height, width, 3)`
+        duration : int, optional
+            Number of frame intervals the frame is shown for, writers without
+            variable frame timing hold the frame by repeating it, by default 1
+        """
+        if self.size is None:
+            self.channels = frame.shape[2]
+            self.setup(frame.shape[1], frame.shape[0])
+        assert (frame.shape[1], frame.shape[0]) == self.size, (
+            f"Frame size {frame.shape[1]}x{frame.shape[0]} does not match "
+            f"writer size {self.size[0]}x{self.size[1]}"
+        )
+        self._write(frame)
+        self._last = frame
+        self.n_frames += 1
+        if duration > 1:
+            self.repeat(duration - 1)
+
+    def repeat(self, duration: int = 1) -> None:
+        """Emits the last written frame again, without encoding it from scratch
+        where the format allows. The data of the last frame must not have changed
+        since it was written (ie. the Agg buffer was not redrawn).
+
+        Parameters
+        ----------
+        duration : int, optional
+            Number of frame intervals to hold the last frame for, by default 1
+        """
+        assert self.n_frames > 0, "No frame to repeat"
+        self._repeat(duration)
+        self.n_frames += duration
+
+    def _write(self, frame: np.ndarray) -> None:
+        raise NotImplementedError
+
+    def _repeat(self, duration: int) -> None:
+        for _ in range(duration):
+            self._write(self._last)
+
+    def finish(self) -> None:
+        """Finalizes the output"""
+
+    def __enter__(self) -> "FrameWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.finish()
+
+
+class FFMpegFrameWriter(FrameWriter):
+    def __init__(
+        self,
+        path: str,
+        fps: float,
+        codec: str = "libx264",
+        pix_fmt: str = "yuv420p",
+        extra_args: list[str] = None,
+    ) -> None:
+        """Pipes raw frames to an ffmpeg process. The ffmpeg binary is taken from
+        `matplotlib.rcParams["animation.ffmpeg_path"]`.
+
+        Parameters
+        ----------
+        path : str
+            Output video path
+        fps : float
+            Frames per second
+        codec : str, optional
+            Video codec, by default "libx264"
+        pix_fmt : str, optional
+            Output pixel format, by default "yuv420p"
+        extra_args : list[str], optional
+            Additional ffmpeg output arguments, by default None
+        """
+        super().__init__(path, fps)
+        self.codec = codec
+        self.pix_fmt = pix_fmt
+        self.extra_args = extra_args or []
+        self._proc = None
+
+    def setup(self, width: int, height: int) -> None:
+        super().setup(width, height)
+        cmd = [
+            mpl.rcParams["animation.ffmpeg_path"],
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgba" if self.channels == 4 else "rgb24",
+            "-s",
+            f"{width}x{height}",
+            "-r",
+            str(self.fps),
+            "-i",
+            "-",
+            "-vf",
+            "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+            "-vcodec",
+            self.codec,
+            "-pix_fmt",
+            self.pix_fmt,
+            *self.extra_args,
+            self.path,
+        ]
+        self._proc = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+
+    def _write(self, frame: np.ndarray) -> None:
+        try:
+            self._proc.stdin.write(np.ascontiguousarray(frame).data)
+        except BrokenPipeError:
+            # ffmpeg exited early, finish raises its error message
+            self.finish()
+            raise
+
+    def finish(self) -> None:
+        if self._proc is None:
+            return
+        proc, self._proc = self._proc, None
+        _, err = proc.communicate()
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed writing {self.path}: {err.decode()}")
+
+
+class PillowFrameWriter(FrameWriter):
+    def __init__(self, path: str, fps: float, loop: int = 0, **kwargs) -> None:
+        """Writes animated gif / webp files using Pillow. Additional kwargs are
+        passed to `PIL.Image.save(**kwargs)`.
+
+        Repeated frames extend the duration of the previous frame instead of
+        adding a frame, so held frames cost nothing in the output.
+
+        Parameters
+        ----------
+        path : str
+            Output path
+        fps : float
+            Frames per second
+        loop : int, optional
+            Number of loops, 0 loops forever, by default 0
+        """
+        super().__init__(path, fps)
+        self.loop = loop
+        self.save_kwargs = kwargs
+        self._frames = []
+        self._durations = []
+
+    def _write(self, frame: np.ndarray) -> None:
+        self._frames.append(Image.fromarray(np.array(frame[..., :3])))
+        self._durations.append(1)
+
+    def _repeat(self, duration: int) -> None:
+        self._durations[-1] += duration
+
+    def finish(self) -> None:
+        if not self._frames:
+            return
+        # frame start times are rounded, not the durations, so the timing
+        # does not drift
+        ends = np.round(np.cumsum(self._durations) * 1000 / self.fps)
+        durations = np.diff(ends, prepend=0).astype(int).tolist()
+        self._frames[0].save(
+            self.path,
+            save_all=True,
+            append_images=self._frames[1:],
+            duration=durations if len(durations) > 1 else durations[0],
+            loop=self.loop,
+            **self.save_kwargs,
+        )
+        self._frames = []
+        self._durations = []
+
+
+class PNGSequenceWriter(FrameWriter):
+    def __init__(self, path: str, fps: float, pattern: str = PNG_PATTERN) -> None:
+        """Writes every frame as a png file inside the directory `path`.
+
+        Parameters
+        ----------
+        path : str
+            Output directory
+        fps : float
+            Frames per second, only recorded for bookkeeping
+        pattern : str, optional
+            File name pattern, by default "frame_{:06d}.png"
+        """
+        super().__init__(path, fps)
+        self.pattern = pattern
+
+    def setup(self, width: int, height: int) -> None:
+        super().setup(width, height)
+        os.makedirs(self.path, exist_ok=True)
+
+    def _write(self, frame: np.ndarray) -> None:
+        Image.fromarray(np.asarray(frame)).save(
+            os.path.join(self.path, self.pattern.format(self.n_frames)),
+            compress_level=1,
+        )
+
+    def _repeat(self, duration: int) -> None:
+        last = os.path.join(self.path, self.pattern.format(self.n_frames - 1))
+        for n in range(self.n_frames, self.n_frames + duration):
+            shutil.copyfile(last, os.path.join(self.path, self.pattern.format(n)))
+
+
+class ContactSheetWriter(FrameWriter):
+    def __init__(self, path: str, fps: float, columns: int = None) -> None:
+        """Tiles every frame into a single image (ie. png or jpg), in rows of
+        `columns` frames. Repeated frames are not tiled again.
+
+        Parameters
+        ----------
+        path : str
+            Output image path
+        fps : float
+            Frames per second, only recorded for bookkeeping
+        columns : int, optional
+            Number of frames per row, by default a square grid
+        """
+        super().__init__(path, fps)
+        self.columns = columns
+        self._frames = []
+
+    def _write(self, frame: np.ndarray) -> None:
+        self._frames.append(Image.fromarray(np.array(frame[..., :3])))
+
+    def _repeat(self, duration: int) -> None:
+        pass
+
+    def finish(self) -> None:
+        if not self._frames:
+            return
+        columns = self.columns or int(np.ceil(np.sqrt(len(self._frames))))
+        rows = int(np.ceil(len(self._frames) / columns))
+        width, height = self.size
+        sheet = Image.new("RGB", (columns * width, rows * height), "white")
+        for n, frame in enumerate(self._frames):
+            sheet.paste(frame, ((n % columns) * width, (n // columns) * height))
+        sheet.save(self.path)
+        self._frames = []
+
+
+class PosterWriter(FrameWriter):
+    def __init__(self, path: str, fps: float, frame: int = -1) -> None:
+        """Writes a single frame of the animation as an image (ie. png or jpg).
+
+        Parameters
+        ----------
+        path : str
+            Output image path
+        fps : float
+            Frames per second, only recorded for bookkeeping
+        frame : int, optional
+            Index of the poster frame, counting repeated frames, -1 keeps the last
+            frame, by default -1
+        """
+        super().__init__(path, fps)
+        self.frame = frame
+        self._poster = None
+
+    def _write(self, frame: np.ndarray) -> None:
+        # the frame shown at `self.frame` is the last one written before it
+        if self.frame < 0 or self.n_frames <= self.frame:
+            self._poster = np.array(frame[..., :3])
+
+    def _repeat(self, duration: int) -> None:
+        pass
+
+    def finish(self) -> None:
+        if self._poster is not None:
+            Image.fromarray(self._poster).save(self.path)
+            self._poster = None
+
+
+def resize_frame(frame: np.ndarray, size: tuple[int, int]) -> np.ndarray:
+    """Resizes a frame with Lanczos resampling.
+
+    Parameters
+    ----------
+    frame : np.ndarray
+        RGBA or RGB frame
+    size : tuple[int, int]
+        Width, height in pixels
+
+    Returns
+    -------
+    np.ndarray
+        The resized frame, the frame itself if it already has this size
+    """
+    if (frame.shape[1], frame.shape[0]) == tuple(size):
+        return frame
+    return np.asarray(Image.fromarray(frame).resize(size, Image.LANCZOS))
+
+
+class MultiFrameWriter(FrameWriter):
+    def __init__(self, outputs: list, fps: float, queue_size: int = 8) -> None:
+        """Fans every frame out to several frame writers, each encoding on its own
+        thread. Frames are copied once and resized once per output resolution, the
+        writers of the same resolution share the resized frame.
+
+        Parameters
+        ----------
+        outputs : list[tuple[FrameWriter, tuple[int, int]]]
+            Writers with their frame size (width, height), None keeps the size of
+            the written frames
+        fps : float
+            Frames per second
+        queue_size : int, optional
+            Maximum number of frames waiting for each writer, by default 8
+        """
+        super().__init__(None, fps)
+        self.writers = [writer for writer, _ in outputs]
+        self._sizes = [size for _, size in outputs]
+        self._queues = [queue.Queue(queue_size) for _ in outputs]
+        self._errors = []
+        self._threads = [
+            threading.Thread(target=self._encode, args=(writer, q), daemon=True)
+            for writer, q in zip(self.writers, self._queues)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _encode(self, writer: FrameWriter, q: queue.Queue) -> None:
+        try:
+            with writer:
+                # None ends the output, a None frame repeats the previous one
+                for frame, duration in iter(q.get, None):
+                    if frame is None:
+                        writer.repeat(duration)
+                    else:
+                        writer.write(frame, duration)
+        except BaseException as err:
+            self._errors.append(err)
+            # keeps draining so the producer never blocks
+            for _ in iter(q.get, None):
+                pass
+
+    def _put(self, frames: list, duration: int) -> None:
+        if self._errors:
+            raise self._errors[0]
+        for frame, q in zip(frames, self._queues):
+            q.put((frame, duration))
+
+    def write(self, frame: np.ndarray, duration: int = 1) -> None:
+        if self.size is None:
+            self.channels = frame.shape[2]
+            self.setup(frame.shape[1], frame.shape[0])
+        # the writers outlive the Agg buffer
+        frame = np.array(frame)
+        resized = {}
+        for size in self._sizes:
+            if size is not None and tuple(size) not in resized:
+                resized[tuple(size)] = resize_frame(frame, size)
+        self._put(
+            [frame if size is None else resized[tuple(size)] for size in self._sizes],
+            duration,
+        )
+        self._last = frame
+        self.n_frames += duration
+
+    def _repeat(self, duration: int) -> None:
+        self._put([None] * len(self.writers), duration)
+
+    def finish(self) -> None:
+        for q in self._queues:
+            q.put(None)
+        for thread in self._threads:
+            thread.join()
+        if self._errors:
+            raise self._errors[0]
+
+
+def get_writer(path: str, fps: float, **kwargs) -> FrameWriter:
+    """Returns a frame writer suitable for the extension of `path`. Paths without
+    an extension are treated as png sequence directories.
+
+    Parameters
+    ----------
+    path : str
+        Output path
+    fps : float
+        Frames per second
+
+    Returns
+    -------
+    FrameWriter
+        The frame writer
+    """
+    extension = os.path.splitext(path)[1][1:].lower()
+    if extension == "":
+        return PNGSequenceWriter(path, fps, **kwargs)
+    if extension in PILLOW_EXTENSIONS:
+        return PillowFrameWriter(path, fps, **kwargs)
+    if extension in VIDEO_EXTENSIONS:
+        return FFMpegFrameWriter(path, fps, **kwargs)
+    raise ValueError(f"Unsupported output extension {extension}")
+
+
+def read_frames(path: str, fps: float = None):
+    """Decodes the frames of a file written by one of the frame writers.
+
+    Parameters
+    ----------
+    path : str
+        Video file, gif / webp file or png sequence directory
+    fps : float, optional
+        Frame rate of gif / webp files, frames shown for several frame intervals
+        (see `FrameWriter.write(duration=...)`) are then repeated, by default None
+
+    Yields
+    ------
+    np.ndarray
+        RGB frames of shape `(height, width, 3)`
+    """
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".png"):
+                with Image.open(os.path.join(path, name)) as img:
+                    yield np.asarray(img.convert("RGB"))
+        return
+
+    extension = os.path.splitext(path)[1][1:].lower()
+    if extension in PILLOW_EXTENSIONS:
+        with Image.open(path) as img:
+            for n in range(getattr(img, "n_frames", 1)):
+                img.seek(n)
+                frame = np.asarray(img.convert("RGB"))
+                repeats = 1
+                if fps is not None and img.info.get("duration"):
+                    repeats = max(1, round(img.info["duration"] * fps / 1000))
+                for _ in range(repeats):
+                    yield frame
+        return
+
+    width, height = _probe_size(path)
+    proc = subprocess.Popen(
+        [
+            mpl.rcParams["animation.ffmpeg_path"],
+            "-loglevel",
+            "error",
+            "-i",
+            path,
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgb24",
+            "-",
+        ],
+        stdout=subprocess.PIPE,
+    )
+    frame_bytes = width * height * 3
+    try:
+        while True:
+            buf = proc.stdout.read(frame_bytes)
+            if len(buf) < frame_bytes:
+                break
+            yield np.frombuffer(buf, np.uint8).reshape(height, width, 3)
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+
+def _ffprobe_path() -> str:
+    # ffprobe sits next to ffmpeg, only the executable name changes
+    ffmpeg = mpl.rcParams["animation.ffmpeg_path"]
+    name = os.path.basename(ffmpeg).replace("ffmpeg", "ffprobe")
+    return os.path.join(os.path.dirname(ffmpeg), name)
+
+
+def _probe_size(path: str) -> tuple[int, int]:
+    out = subprocess.run(
+        [
+            _ffprobe_path(),
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "stream=width,height",
+            "-of",
+            "csv=p=0",
+            path,
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    width, height = out.stdout.strip().split(",")
+    return int(width), int(height)
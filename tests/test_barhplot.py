@@ -1,3 +1,9 @@
+import matplotlib.pyplot as plt
+import pandas as pd
+from matplotlib.colors import to_rgba
+from matplotlib.patches import FancyBboxPatch
+
+from pynimate import baseplot
 from pynimate.barhplot import Barhplot
 
 
@@ -58,3 +64,76 @@ def test_barhplot_ith_bar_attrs(sample_data1):
         ith_attrs = barhplot.get_ith_bar_attrs(i)
         assert list(ith_attrs.bar_rank) == bar_ranks[i]
         assert list(ith_attrs.bar_length) == bar_lengths[i]
+
+
+def test_barhplot_rounded_edges_pool(sample_data1_bardfr):
+    fig, ax = plt.subplots()
+    bar = Barhplot(sample_data1_bardfr, rounded_edges=True)
+    bar.set_axes(ax)
+    bar.update(0)
+    patches = list(ax.patches)
+    bar.update(4)
+    assert list(ax.patches) == patches
+    assert all(isinstance(patch, FancyBboxPatch) for patch in patches)
+    assert [patch.get_width() for patch in patches] == list(
+        bar.bar_attr.bar_length
+    )
+    plt.close(fig)
+
+
+def test_barhplot_collection_backend(sample_data1_bardfr):
+    fig, ax = plt.subplots()
+    bar = Barhplot(sample_data1_bardfr)
+    bar.set_barh(backend="collection")
+    bar.set_axes(ax)
+    bar.update(0)
+    bar.update(4)
+    assert len(ax.patches) == 0 and len(ax.collections) == 1
+    assert len(ax.collections[0].get_paths()) == len(bar.bar_attr.bar_length)
+    (batch,) = ax.artists
+    assert batch.get_texts() == [str(x) for x in bar.get_frame(4).bar_annots]
+    plt.close(fig)
+
+
+def test_barhplot_batch_annots(sample_data1_bardfr):
+    calls = []
+
+    def annots(lengths):
+        calls.append(lengths)
+        return [f"{x:.1f}" for x in lengths]
+
+    bar = Barhplot(sample_data1_bardfr)
+    bar.set_bar_annots(annots, batch=True)
+    texts = bar.get_frame(2).bar_annots
+    assert texts == [f"{x:.1f}" for x in bar.get_ith_bar_attrs(2).bar_length]
+    assert bar.get_frame(2).bar_annots == texts and len(calls) == 1
+
+
+def test_barhplot_label_cache_bounded(sample_data1_bardfr, monkeypatch):
+    monkeypatch.setattr(baseplot, "_LABEL_CACHE_FRAMES", 3)
+    bar = Barhplot(sample_data1_bardfr)
+    for i in range(bar.length):
+        bar.get_frame(i)
+        bar.get_frame(0)
+    # the most recently used frames are kept
+    assert list(bar._label_cache["bar_annots"]) == [bar.length - 2, bar.length - 1, 0]
+
+
+def test_barhplot_bar_colors_rgba(sample_data1_bardfr):
+    bar = Barhplot(sample_data1_bardfr)
+    bar.set_column_colors({"USA": "red"})
+    bar_attr = bar.get_ith_bar_attrs(3)
+    assert bar_attr.column_colors.shape == (len(bar_attr.top_cols), 4)
+    for col, color in zip(bar_attr.top_cols, bar_attr.column_colors):
+        assert tuple(color) == to_rgba(bar.column_colors[col])
+
+
+def test_barhplot_bar_attr_vars(sample_data1_bardfr):
+    columns = sample_data1_bardfr.data.columns
+    sample_data1_bardfr.add_var(
+        col_var=pd.DataFrame({"code": [c[:2] for c in columns]}, index=columns)
+    )
+    bar = Barhplot(sample_data1_bardfr)
+    bar_attr = bar.get_ith_bar_attrs(2)
+    assert list(columns[bar_attr.col_index]) == list(bar_attr.top_cols)
+    assert list(bar_attr.col_vars["code"]) == [c[:2] for c in bar_attr.top_cols]
@@ -150,3 +150,22 @@ def test_baseplot_remove_text(sample_data1_basedfr):
 
     bar.remove_text(["text1", "text2"])
     assert list(bar.text_collection.keys()) == ["text3"]
+
+
+def test_baseplot_batch_time_labels(sample_data1_basedfr):
+    base_plot = Baseplot(sample_data1_basedfr)
+    index = sample_data1_basedfr.data.index
+    base_plot.set_time()
+    assert base_plot.get_frame(2).texts["time"] == str(index[2])
+    base_plot.set_time("%Y")
+    assert base_plot.get_frame(2).texts["time"] == index[2].strftime("%Y")
+
+    calls = []
+
+    def quarters(index):
+        calls.append(index)
+        return "Q" + index.quarter.astype(str)
+
+    base_plot.set_text("quarter", callback=quarters, batch=True)
+    texts = [base_plot.get_frame(i).texts["quarter"] for i in range(len(index))]
+    assert texts == [f"Q{time.quarter}" for time in index] and len(calls) == 1
@@ -0,0 +1,28 @@
+import numpy as np
+
+from pynimate.cache import FrameCache
+
+
+def test_frame_cache_roundtrip(tmp_path):
+    cache = FrameCache(str(tmp_path))
+    frame = np.arange(4 * 3 * 4, dtype=np.uint8).reshape(4, 3, 4)
+    assert cache.get("a") is None
+    cache.put("a", frame)
+    assert np.array_equal(cache.get("a"), frame)
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.entries) == (1, 1, 1)
+
+    reopened = FrameCache(str(tmp_path))
+    assert np.array_equal(reopened.get("a"), frame)
+
+
+def test_frame_cache_lru_eviction(tmp_path):
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (16, 16, 4), dtype=np.uint8) for _ in range(3)]
+    cache = FrameCache(str(tmp_path), max_bytes=10**9)
+    cache.put("a", frames[0])
+    cache.put("b", frames[1])
+    cache.max_bytes = cache.size + 64
+    cache.get("a")
+    cache.put("c", frames[2])
+    assert cache.get("b") is None and cache.get("a") is not None
+    assert cache.stats.evictions == 1 and len(cache) == 2
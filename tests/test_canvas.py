@@ -0,0 +1,341 @@
+import os
+import shutil
+
+import matplotlib as mpl
+import numpy as np
+import pandas as pd
+import pytest
+from PIL import Image
+
+from pynimate.barhplot import Barhplot
+from pynimate.cache import FrameCache
+from pynimate.canvas import Canvas
+from pynimate.segments import SegmentManifest, compare_outputs, concat
+from pynimate.writers import (
+    FFMpegFrameWriter,
+    PNGSequenceWriter,
+    _ffprobe_path,
+    read_frames,
+    resize_frame,
+)
+
+requires_ffmpeg = pytest.mark.skipif(
+    shutil.which(mpl.rcParams["animation.ffmpeg_path"]) is None,
+    reason="ffmpeg is not installed",
+)
+
+def make_canvas(sample_data1) -> Canvas:
+    cnv = Canvas(figsize=(3, 2), dpi=40)
+    bar = Barhplot.from_df(sample_data1, "%Y-%m-%d", "3MS")
+    bar.set_time(callback=lambda i, datafier: datafier.data.index[i].year)
+    cnv.add_plot(bar)
+    return cnv
+
+
+def test_canvas_render_range(sample_data1, tmp_path):
+    cnv = make_canvas(sample_data1)
+    cnv.render_range(2, 5, str(tmp_path / "out"), 10)
+    frames = list(read_frames(str(tmp_path / "out")))
+    assert len(frames) == 3 and frames[0].shape == (80, 120, 3)
+
+
+def test_canvas_segments_concat(sample_data1, tmp_path):
+    cnv = make_canvas(sample_data1)
+    cnv.render_range(0, cnv.length, str(tmp_path / "single"), 10)
+
+    manifest = cnv.plan_segments(str(tmp_path / "segs"), 10, n_segments=3, extension="")
+    assert [(seg.start, seg.stop) for seg in manifest.segments] == [
+        (0, 3),
+        (3, 6),
+        (6, 9),
+    ]
+    manifest = SegmentManifest.load(str(tmp_path / "segs" / "manifest.json"))
+    for seg in manifest.segments:
+        cnv.render_range(seg.start, seg.stop, manifest.resolve(seg.path), 10)
+
+    concat(manifest, str(tmp_path / "stitched"), reference=str(tmp_path / "single"))
+    assert compare_outputs(str(tmp_path / "stitched"), str(tmp_path / "single"))
+    assert len(os.listdir(tmp_path / "stitched")) == cnv.length
+
+
+@requires_ffmpeg
+def test_canvas_segments_concat_video(sample_data1, tmp_path):
+    # lossless h264, so the only differences are yuv rounding
+    codec_args = {"pix_fmt": "yuv444p", "extra_args": ["-qp", "0"]}
+    cnv = make_canvas(sample_data1)
+    cnv.render_range(0, cnv.length, str(tmp_path / "single.mp4"), 10, **codec_args)
+
+    manifest = cnv.plan_segments(
+        str(tmp_path / "segs"), 10, n_segments=3, extension="mp4"
+    )
+    for seg in manifest.segments:
+        cnv.render_range(
+            seg.start, seg.stop, manifest.resolve(seg.path), 10, **codec_args
+        )
+    concat(manifest, str(tmp_path / "stitched.mp4"))
+    assert len(list(read_frames(str(tmp_path / "stitched.mp4")))) == cnv.length
+    assert compare_outputs(
+        str(tmp_path / "stitched.mp4"), str(tmp_path / "single.mp4"), tolerance=4
+    )
+
+
+def test_ffmpeg_writer_early_exit(tmp_path, monkeypatch):
+    ffmpeg = tmp_path / "ffmpeg"
+    ffmpeg.write_text("#!/bin/sh\necho 'Unknown encoder' >&2\nexit 1\n")
+    ffmpeg.chmod(0o755)
+    monkeypatch.setitem(mpl.rcParams, "animation.ffmpeg_path", str(ffmpeg))
+    frame = np.zeros((512, 512, 4), dtype=np.uint8)
+    with pytest.raises(RuntimeError, match="Unknown encoder"):
+        with FFMpegFrameWriter(str(tmp_path / "out.mp4"), 10) as writer:
+            for _ in range(4):
+                writer.write(frame)
+
+
+def test_ffprobe_path(monkeypatch):
+    monkeypatch.setitem(
+        mpl.rcParams, "animation.ffmpeg_path", "/opt/ffmpeg/bin/ffmpeg"
+    )
+    assert _ffprobe_path() == "/opt/ffmpeg/bin/ffprobe"
+    monkeypatch.setitem(mpl.rcParams, "animation.ffmpeg_path", "ffmpeg")
+    assert _ffprobe_path() == "ffprobe"
+
+
+def test_canvas_save_pipelined(sample_data1, tmp_path):
+    cnv = make_canvas(sample_data1)
+    stats = cnv.save(str(tmp_path / "pipelined"), 10, "", pipelined=True, queue_size=2)
+    cnv.render_range(0, cnv.length, str(tmp_path / "serial"), 10)
+    assert stats.frames == cnv.length
+    assert set(stats.utilisation) == {"prepare", "draw", "encode"}
+    assert stats.bottleneck in stats.utilisation
+    assert compare_outputs(str(tmp_path / "pipelined"), str(tmp_path / "serial"))
+
+
+def test_canvas_save_resumable(sample_data1, tmp_path, monkeypatch):
+    cnv = make_canvas(sample_data1)
+    out = str(tmp_path / "resumable")
+    # interrupt the render while writing frame 5, the plot config stays the same
+    written = []
+    write = PNGSequenceWriter._write
+
+    def failing_write(self, frame):
+        if len(written) == 5:
+            raise RuntimeError("Render interrupted")
+        written.append(frame)
+        write(self, frame)
+
+    monkeypatch.setattr(PNGSequenceWriter, "_write", failing_write)
+    with pytest.raises(RuntimeError):
+        cnv.save(out, 10, "", resumable=True, segment_frames=2)
+    assert os.path.exists(tmp_path / "resumable.segments" / "manifest.json")
+
+    monkeypatch.undo()
+    stats = cnv.save(out, 10, "", resumable=True, segment_frames=2)
+    assert (stats.segments, stats.rendered, stats.resumed_from) == (5, 3, 4)
+    assert not os.path.exists(tmp_path / "resumable.segments")
+
+    cnv.render_range(0, cnv.length, str(tmp_path / "serial"), 10)
+    assert compare_outputs(out, str(tmp_path / "serial"))
+
+
+def test_canvas_save_cached(sample_data1, tmp_path):
+    cache = FrameCache(str(tmp_path / "cache"))
+    cnv = make_canvas(sample_data1)
+    stats = cnv.save(str(tmp_path / "first"), 10, "", cache=cache)
+    assert stats.cache_misses == cnv.length
+
+    stats = cnv.save(str(tmp_path / "second"), 10, "", pipelined=True, cache=cache)
+    assert stats.cache_hits == cnv.length
+    assert compare_outputs(str(tmp_path / "first"), str(tmp_path / "second"))
+
+    cnv.plots[0].set_title("Edited")
+    stats = cnv.save(str(tmp_path / "third"), 10, "", cache=cache)
+    assert stats.cache_hits == 0
+
+    # an edited default of a callback
+    def time_callback(i, datafier, fmt="%Y"):
+        return datafier.data.index[i].strftime(fmt)
+
+    cnv.plots[0].set_time(callback=time_callback)
+    cnv.save(str(tmp_path / "fourth"), 10, "", cache=cache)
+    time_callback.__defaults__ = ("%b %Y",)
+    stats = cnv.save(str(tmp_path / "fifth"), 10, "", cache=cache)
+    assert stats.cache_hits == 0
+
+
+def test_canvas_save_resumable_cached(sample_data1, tmp_path, monkeypatch):
+    cache = FrameCache(str(tmp_path / "cache"))
+    cnv = make_canvas(sample_data1)
+    digests = []
+    figure_digest = Canvas._figure_digest
+
+    def counting_digest(self, i):
+        digests.append(i)
+        return figure_digest(self, i)
+
+    monkeypatch.setattr(Canvas, "_figure_digest", counting_digest)
+    out = str(tmp_path / "resumable")
+    stats = cnv.save(out, 10, "", resumable=True, segment_frames=2, cache=cache)
+    # frame 0 is drawn for the digest once, not once per segment
+    assert stats.segments == 5 and digests == [0]
+    cnv.render_range(0, cnv.length, str(tmp_path / "serial"), 10)
+    assert compare_outputs(out, str(tmp_path / "serial"))
+
+
+def test_canvas_save_cached_static_layer(sample_data1, tmp_path):
+    cache = FrameCache(str(tmp_path / "cache"))
+    cnv = make_canvas(sample_data1)
+    cnv.save(str(tmp_path / "first"), 10, "", cache=cache)
+
+    cnv.ax[0][0].set_facecolor("black")
+    stats = cnv.save(str(tmp_path / "black"), 10, "", cache=cache)
+    assert stats.cache_hits == 0
+    cnv.render_range(0, cnv.length, str(tmp_path / "serial"), 10)
+    assert compare_outputs(str(tmp_path / "black"), str(tmp_path / "serial"))
+
+    cnv.ax[0][0].grid(True)
+    assert cnv.save(str(tmp_path / "grid"), 10, "", cache=cache).cache_hits == 0
+
+    cnv.layered = True
+    assert cnv.save(str(tmp_path / "layered"), 10, "", cache=cache).cache_hits == 0
+
+
+def test_canvas_layered(sample_data1, tmp_path):
+    cnv = make_canvas(sample_data1)
+    cnv.render_range(0, cnv.length, str(tmp_path / "full"), 10)
+    layered = make_canvas(sample_data1)
+    layered.layered = True
+    stats = layered.save(str(tmp_path / "layered"), 10, "")
+    assert stats.frames == layered.length
+    assert layered.plots[0].ax.yaxis.get_animated() is False
+
+    # static artists above the bars (ie. spines) are drawn over them
+    assert compare_outputs(str(tmp_path / "layered"), str(tmp_path / "full"))
+
+
+def test_canvas_save_dedupe(tmp_path):
+    data = pd.DataFrame(
+        {"a": [1, 1, 3], "b": [2, 2, 1], "c": [3, 3, 2]},
+        index=["1960-01-01", "1961-01-01", "1962-01-01"],
+    )
+    cnv = make_canvas(data)
+    stats = cnv.save(str(tmp_path / "dedupe"), 10, "", dedupe=True)
+    # the four 1960 frames have the same bars and time text
+    assert stats.skipped_frames == 3
+    cnv.render_range(0, cnv.length, str(tmp_path / "serial"), 10)
+    assert compare_outputs(str(tmp_path / "dedupe"), str(tmp_path / "serial"))
+
+    stats = cnv.save(str(tmp_path / "pipelined"), 10, "", pipelined=True, dedupe=True)
+    assert stats.skipped_frames == 3
+    assert compare_outputs(str(tmp_path / "pipelined"), str(tmp_path / "serial"))
+
+
+def test_canvas_save_threshold(sample_data1, tmp_path):
+    cnv = make_canvas(sample_data1)
+    frames, durations = cnv.sample_frames(10)
+    # only the year changes are kept, with the first and last frames
+    assert frames == [0, 4, 8] and durations == [4, 4, 1]
+    assert cnv.sample_frames(0) == (list(range(cnv.length)), [1] * cnv.length)
+
+    stats = cnv.save(str(tmp_path / "sampled"), 10, "", threshold=10)
+    assert (stats.frames, stats.dropped_frames) == (3, cnv.length - 3)
+    sampled = list(read_frames(str(tmp_path / "sampled")))
+    assert len(sampled) == cnv.length
+    assert (sampled[1] == sampled[0]).all() and (sampled[4] != sampled[3]).any()
+
+    cnv.save(str(tmp_path / "sampled.gif"), 10, "", threshold=10)
+    assert len(list(read_frames(str(tmp_path / "sampled.gif"), 10))) == cnv.length
+
+
+def test_canvas_preview(sample_data1, tmp_path):
+    cnv = make_canvas(sample_data1)
+    stats = cnv.preview(str(tmp_path / "preview.gif"), dpi=20, stride=3)
+    assert (stats.stride, stats.frames) == (3, 3) and cnv.fig.dpi == 40
+    frames = list(read_frames(str(tmp_path / "preview.gif"), 24))
+    assert len(frames) == cnv.length and frames[0].shape == (40, 60, 3)
+
+    stats = cnv.preview(str(tmp_path / "sheet.png"), budget_seconds=60, dpi=20)
+    # a generous budget renders every frame
+    assert stats.stride == 1 and stats.frame_cost > 0
+    with Image.open(tmp_path / "sheet.png") as sheet:
+        assert sheet.size == (3 * 60, 3 * 40)
+
+    stats = cnv.preview(str(tmp_path / "tiny.gif"), budget_seconds=0, dpi=20)
+    assert stats.stride == cnv.length and stats.frames == 1
+
+    cnv.frames = []
+    with pytest.raises(ValueError):
+        cnv.preview(str(tmp_path / "empty.gif"))
+
+
+def test_canvas_render_frame(sample_data1, tmp_path):
+    cnv = make_canvas(sample_data1)
+    cnv.render_range(0, cnv.length, str(tmp_path / "serial"), 10)
+    serial = list(read_frames(str(tmp_path / "serial")))
+
+    frame = cnv.render_frame(5)
+    assert frame.shape == (80, 120, 3) and (frame == serial[5]).all()
+    assert cnv.render_frame(5) is frame and not frame.flags.writeable
+
+    indices = [8, 2, 2, -1, 0]
+    for i, frame in zip(indices, cnv.render_frames(indices)):
+        assert (frame == serial[i]).all()
+
+    cnv.set_frame_cache(2)
+    frames = [np.array(frame) for frame in cnv.render_frames([3, 4, 3, 7])]
+    assert all((frame == serial[i]).all() for i, frame in zip([3, 4, 3, 7], frames))
+    assert list(cnv._frame_lru) == [3, 7]
+
+
+def test_canvas_iter_frames(sample_data1, tmp_path):
+    cnv = make_canvas(sample_data1)
+    cnv.render_range(0, cnv.length, str(tmp_path / "serial"), 10)
+    serial = list(read_frames(str(tmp_path / "serial")))
+
+    frames = [np.array(frame) for frame in cnv.iter_frames()]
+    assert len(frames) == cnv.length and frames[0].shape == (80, 120, 4)
+    assert all((frame[..., :3] == rgb).all() for frame, rgb in zip(frames, serial))
+
+    inverted = (255 - frame[..., :3] for frame in cnv.iter_frames())
+    stats = cnv.save_from_iter(inverted, str(tmp_path / "inverted"), 10, "")
+    assert stats.frames == cnv.length
+    for frame, rgb in zip(read_frames(str(tmp_path / "inverted")), serial):
+        assert (frame == 255 - rgb).all()
+
+
+def test_canvas_save_many(sample_data1, tmp_path):
+    cnv = make_canvas(sample_data1)
+    cnv.render_range(0, cnv.length, str(tmp_path / "serial"), 10)
+    serial = list(read_frames(str(tmp_path / "serial")))
+
+    stats = cnv.save_many(
+        [
+            str(tmp_path / "frames"),
+            str(tmp_path / "out.gif"),
+            {"path": str(tmp_path / "small.gif"), "size": (60, 40)},
+            {"path": str(tmp_path / "small"), "size": (60, 40)},
+            {"path": str(tmp_path / "poster.png"), "frame": 5},
+            str(tmp_path / "last.png"),
+        ],
+        10,
+        dedupe=True,
+    )
+    assert stats.frames == cnv.length
+    assert compare_outputs(str(tmp_path / "frames"), str(tmp_path / "serial"))
+    gif = list(read_frames(str(tmp_path / "out.gif"), 10))
+    assert len(gif) == cnv.length
+    small = list(read_frames(str(tmp_path / "small.gif"), 10))
+    assert len(small) == cnv.length and small[0].shape == (40, 60, 3)
+    for frame, rgb in zip(read_frames(str(tmp_path / "small")), serial):
+        assert (frame == resize_frame(rgb, (60, 40))).all()
+    with Image.open(tmp_path / "poster.png") as poster:
+        assert (np.asarray(poster) == serial[5]).all()
+    with Image.open(tmp_path / "last.png") as poster:
+        assert (np.asarray(poster) == serial[-1]).all()
+
+
+def test_canvas_save_many_writer_error(sample_data1, tmp_path):
+    cnv = make_canvas(sample_data1)
+    # a file where the png sequence directory should be
+    (tmp_path / "taken").write_text("")
+    with pytest.raises(OSError):
+        cnv.save_many([str(tmp_path / "out.gif"), str(tmp_path / "taken")], 10)
@@ -1,4 +1,6 @@
 # Legacy tests for datafier, will be removed in 2.0.0
+import matplotlib.dates as mdates
+import numpy as np
 import pandas as pd
 
 from pynimate.datafier import Datafier, BaseDatafier, BarDatafier
@@ -237,3 +239,27 @@ def test_bardfr_get_top_cols(map_data):
         "USA",
     ]
     assert dfr.get_top_cols() == top_cols
+
+
+def test_linedfr_time_num(sample_data1_linedfr):
+    time_num = sample_data1_linedfr.time_num
+    assert time_num.dtype == np.float64
+    assert np.allclose(time_num, mdates.date2num(sample_data1_linedfr.data.index))
+
+
+def test_basedfr_add_var(sample_data1):
+    dfr = BaseDatafier(sample_data1, "%Y-%m-%d", "3MS")
+    row_var = pd.DataFrame(
+        {"pop": [0.0, 10.0, 20.0], "era": ["a", "b", "c"]},
+        index=["1960-01-01", "1961-01-01", "1962-01-01"],
+    )
+    col_var = pd.DataFrame(
+        {"continent": ["Asia", "Europe"]}, index=["Afghanistan", "Albania"]
+    )
+    dfr.add_var(row_var=row_var, col_var=col_var)
+    assert list(dfr.row_var.index) == list(dfr.data.index)
+    assert list(dfr.row_vars["pop"][:5]) == [0.0, 2.5, 5.0, 7.5, 10.0]
+    assert list(dfr.row_vars["era"][:5]) == ["a", "a", "a", "a", "b"]
+    continent = dfr.col_vars["continent"]
+    assert len(continent) == len(dfr.data.columns)
+    assert continent[list(dfr.data.columns).index("Albania")] == "Europe"
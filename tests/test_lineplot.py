@@ -1,4 +1,9 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
 from pynimate.lineplot import Lineplot
+from pynimate.utils import human_readable, human_readable_array
 
 
 def test_lineplot_linestyle(sample_data1_linedfr):
@@ -26,3 +31,127 @@ def test_lineplot_linestyle_dict(sample_data1_linedfr):
     }
 
     assert plot.column_linestyles == linestyles
+
+
+def test_lineplot_collection_backend(sample_data1_linedfr):
+    fig, ax = plt.subplots()
+    line = Lineplot(sample_data1_linedfr)
+    line.set_line(backend="collection")
+    line.set_axes(ax)
+    line.update(1)
+    legend = ax.get_legend()
+    line.update(4)
+    # only the hidden lines placing the legend
+    assert ax.get_legend() is legend
+    assert not any(line.get_visible() for line in ax.lines)
+    lines, markers, heads = ax.collections
+    assert len(lines.get_segments()) == 5
+    assert all(len(seg) == 5 for seg in lines.get_segments())
+    assert len(markers.get_offsets()) == 5 and len(heads.get_offsets()) == 5
+    plt.close(fig)
+
+
+def test_lineplot_collection_legend_position():
+    data = pd.DataFrame(
+        np.random.RandomState(1).rand(12, 4).cumsum(0),
+        index=pd.date_range("2000", periods=12, freq="D"),
+        columns=list("abcd"),
+    )
+    positions = {}
+    for backend in ("artists", "collection"):
+        fig, ax = plt.subplots(figsize=(4, 3), dpi=50)
+        line = Lineplot.from_df(
+            data, "%Y-%m-%d", "12h", scatter_markers=False, line_head=False
+        )
+        line.set_line(backend=backend)
+        line.set_axes(ax)
+        positions[backend] = []
+        for i in (3, 10, 20):
+            line.update(i)
+            fig.canvas.draw()
+            positions[backend].append(ax.get_legend().get_window_extent().bounds)
+        plt.close(fig)
+    # "best" moves the legend away from the lines in both backends
+    assert positions["artists"] == positions["collection"]
+    assert len(set(positions["artists"])) > 1
+
+
+def test_lineplot_lod(sample_data1_linedfr):
+    fig, ax = plt.subplots()
+    line = Lineplot(sample_data1_linedfr)
+    line.set_lod("minmax", pixels=2)
+    line.set_axes(ax)
+    line.update(8)
+    assert len(ax.lines[0].get_xdata()) < 9
+    plt.close(fig)
+
+
+def test_lineplot_window(sample_data1_linedfr):
+    fig, ax = plt.subplots()
+    line = Lineplot(sample_data1_linedfr)
+    line.set_window(3)
+    line.set_axes(ax)
+    line.update(6)
+    assert len(ax.lines[0].get_xdata()) == 3
+    data = sample_data1_linedfr.data.iloc[4:7]
+    low, high = ax.get_ylim()
+    assert low < data.min().min() and high > data.max().max()
+    assert high < sample_data1_linedfr.data.max().max()
+    plt.close(fig)
+
+
+def test_lineplot_lim_schedule(sample_data1_linedfr):
+    fig, ax = plt.subplots()
+    line = Lineplot(sample_data1_linedfr)
+    line.set_lim_schedule(smoothing=3)
+    line.set_axes(ax)
+    line.update(4)
+    schedule = line._get_schedule()
+    assert ax.get_ylim() == (schedule["y"].low[4], schedule["y"].high[4])
+    ticks = ax.get_yticks()
+    assert np.allclose(np.diff(ticks), schedule["y"].steps[4])
+    assert "x" not in schedule
+    plt.close(fig)
+
+
+def test_lineplot_time_num(sample_data1_linedfr):
+    fig, ax = plt.subplots()
+    line = Lineplot(sample_data1_linedfr)
+    line.set_axes(ax)
+    line.update(3)
+    xdata = ax.lines[0].get_xdata()
+    assert np.asarray(xdata).dtype == np.float64
+    assert np.array_equal(xdata, sample_data1_linedfr.time_num[:4])
+    plt.close(fig)
+
+
+def test_lineplot_batch_annots(sample_data1_linedfr):
+    line = Lineplot(sample_data1_linedfr)
+    line.set_line_annots(
+        lambda cols, vals: cols + human_readable_array(vals), batch=True
+    )
+    scalar = Lineplot(sample_data1_linedfr)
+    scalar.set_line_annots(lambda col, val: col + human_readable(val))
+    assert line.get_frame(3).line_annots == scalar.get_frame(3).line_annots
+
+
+def test_lineplot_line_attr_vars(sample_data1_linedfr):
+    columns = sample_data1_linedfr.data.columns
+    sample_data1_linedfr.add_var(
+        col_var=pd.DataFrame({"code": [c[:2] for c in columns]}, index=columns)
+    )
+    line = Lineplot(sample_data1_linedfr)
+    line.set_line_annots(
+        lambda col, val, row_vars, col_vars: col_vars["code"], with_vars=True
+    )
+    frame = line.get_frame(2)
+    assert list(frame.line_attr.col_vars["code"]) == [c[:2] for c in columns]
+    assert list(frame.line_annots.values()) == [c[:2] for c in columns]
+
+    batch = Lineplot(sample_data1_linedfr)
+    batch.set_line_annots(
+        lambda cols, vals, row_vars, col_vars: list(col_vars["code"]),
+        batch=True,
+        with_vars=True,
+    )
+    assert batch.get_frame(2).line_annots == frame.line_annots
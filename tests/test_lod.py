@@ -0,0 +1,27 @@
+import numpy as np
+
+from pynimate.lod import LineDecimator
+
+
+def test_line_decimator_minmax():
+    rng = np.random.default_rng(0)
+    x = np.arange(1000.0)
+    y = rng.standard_normal((1000, 2)).cumsum(axis=0)
+    decimator = LineDecimator(x, y, 50, "minmax")
+    lines = decimator.get(999)
+    assert lines.shape == (2, 80, 2)
+    assert np.allclose(lines[:, :, 1].max(axis=1), y.max(axis=0))
+    assert np.allclose(lines[:, :, 1].min(axis=1), y.min(axis=0))
+    assert np.all(np.diff(lines[:, :, 0], axis=1) >= 0)
+
+
+def test_line_decimator_incremental():
+    rng = np.random.default_rng(1)
+    x = np.arange(500.0)
+    y = rng.standard_normal((500, 3)).cumsum(axis=0)
+    for method in ("minmax", "lttb"):
+        decimator = LineDecimator(x, y, 20, method)
+        for i in (10, 130, 499, 250):
+            expected = LineDecimator(x, y, 20, method).get(i)
+            assert np.array_equal(decimator.get(i), expected)
+            assert expected[0, -1, 0] == i
@@ -0,0 +1,17 @@
+import pytest
+
+from pynimate.pipeline import run_pipeline
+
+
+def test_run_pipeline_order():
+    out = []
+    stats = run_pipeline(range(20), lambda i: i * 2, lambda i, d: (i, d), out.append, 2)
+    assert out == [(i, i * 2) for i in range(20)] and stats.frames == 20
+
+
+def test_run_pipeline_error():
+    def encode(item):
+        raise RuntimeError("encoder failed")
+
+    with pytest.raises(RuntimeError):
+        run_pipeline(range(100), lambda i: i, lambda i, d: d, encode, 2)
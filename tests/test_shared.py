@@ -0,0 +1,33 @@
+import pickle
+
+import numpy as np
+
+from pynimate.barhplot import Barhplot
+
+
+def test_shared_datafier_attach(sample_data1_bardfr):
+    dfr = sample_data1_bardfr
+    with dfr.export_shared() as handle:
+        attached = pickle.loads(pickle.dumps(handle)).attach()
+        assert attached.data.equals(dfr.data)
+        assert attached.df_ranks.equals(dfr.df_ranks)
+        assert attached.expanded.equals(dfr.expanded)
+        assert attached.n_bars == dfr.n_bars and attached.top_cols == dfr.top_cols
+
+        values = attached.data.values
+        assert not values.flags.writeable
+        assert any(
+            np.shares_memory(values, np.frombuffer(shm.buf, np.uint8))
+            for shm in attached._shared_blocks
+        )
+        del values, attached
+
+
+def test_shared_spec_build(sample_data1_bardfr):
+    plot = Barhplot(sample_data1_bardfr)
+    with sample_data1_bardfr.export_shared() as handle:
+        spec = pickle.loads(pickle.dumps(plot.to_spec(shared=handle)))
+        rebuilt = spec.build()
+        attrs = rebuilt.get_ith_bar_attrs(2)
+        assert np.array_equal(attrs.bar_rank, plot.get_ith_bar_attrs(2).bar_rank)
+        del rebuilt, attrs, spec
@@ -0,0 +1,105 @@
+import functools
+import pickle
+
+import numpy as np
+import pytest
+
+from pynimate.barhplot import Barhplot
+from pynimate.lineplot import Lineplot
+from pynimate.spec import CallableRef, PlotSpec, config_hash
+from pynimate.utils import human_readable
+
+
+def time_callback(i, datafier):
+    return datafier.data.index[i].year
+
+
+def test_callable_ref():
+    ref = CallableRef.from_callable(human_readable)
+    assert ref.name == "pynimate.utils:human_readable"
+    assert ref.resolve() is human_readable
+
+
+def test_callable_ref_lambda():
+    with pytest.raises(ValueError):
+        CallableRef.from_callable(lambda i: i)
+
+
+def test_spec_barhplot_roundtrip(sample_data1_bardfr):
+    plot = Barhplot(sample_data1_bardfr)
+    plot.set_time(callback=time_callback)
+    plot.set_bar_annots(text_callback=human_readable, color="w")
+    spec = pickle.loads(pickle.dumps(plot.to_spec()))
+
+    rebuilt = spec.build()
+    assert isinstance(rebuilt, Barhplot)
+    assert rebuilt.text_collection["time"][0] is time_callback
+    assert rebuilt.bar_annot_props == plot.bar_annot_props
+    assert rebuilt.column_colors == plot.column_colors
+    attrs, rebuilt_attrs = plot.get_ith_bar_attrs(3), rebuilt.get_ith_bar_attrs(3)
+    assert np.array_equal(attrs.bar_length, rebuilt_attrs.bar_length)
+
+
+def test_spec_lineplot_defaults(sample_data1_linedfr):
+    spec = Lineplot(sample_data1_linedfr).to_spec()
+    assert isinstance(spec, PlotSpec) and "ax" not in spec.state
+    rebuilt = pickle.loads(pickle.dumps(spec)).build()
+    assert rebuilt.line_annot_props["callback"]("a", 2000) == "a(2.0K)"
+
+
+SCALE = 1000
+
+
+def scaled_callback(value, digits=1):
+    return round(value / SCALE, digits)
+
+
+class Formatter:
+    def __init__(self, unit):
+        self.unit = unit
+
+    def short(self, value):
+        return f"{value}{self.unit}"
+
+    def long(self, value):
+        return f"{value} {self.unit}"
+
+
+def test_config_hash_callbacks(sample_data1_bardfr, monkeypatch):
+    assert config_hash(Formatter("k").short) != config_hash(Formatter("k").long)
+    assert config_hash(Formatter("k").short) != config_hash(Formatter("M").short)
+    assert config_hash(Formatter("k").short) == config_hash(Formatter("k").short)
+    assert config_hash(functools.partial(round, ndigits=1)) != config_hash(
+        functools.partial(round, ndigits=2)
+    )
+    assert config_hash(functools.partial(time_callback, 1)) != config_hash(
+        functools.partial(human_readable, 1)
+    )
+
+    # defaults and globals read by a callback
+    before = config_hash(scaled_callback)
+    scaled_callback.__defaults__ = (2,)
+    changed_default = config_hash(scaled_callback)
+    scaled_callback.__defaults__ = (1,)
+    monkeypatch.setitem(globals(), "SCALE", 1e6)
+    changed_global = config_hash(scaled_callback)
+    monkeypatch.undo()
+    assert len({before, changed_default, changed_global}) == 3
+    assert config_hash(scaled_callback) == before
+
+    # a closure over a variable assigned after the callback is hashed
+    def make_callback():
+        def callback(i):
+            return offset + i
+
+        hashed = config_hash(callback)
+        offset = 1
+        return hashed, callback
+
+    hashed, callback = make_callback()
+    assert hashed != config_hash(callback)
+
+    # a plot holding its own bound method
+    bar = Barhplot(sample_data1_bardfr)
+    bar.set_time(callback=bar.get_frame)
+    assert config_hash(bar) == config_hash(bar)
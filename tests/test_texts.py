@@ -0,0 +1,75 @@
+import matplotlib.pyplot as plt
+
+from pynimate import texts
+from pynimate.barhplot import Barhplot
+from pynimate.texts import TextPool
+
+
+def test_text_pool_reuse():
+    fig, ax = plt.subplots()
+    pool = TextPool(ax)
+    first = pool.text("a", 0, 0, "foo", size=10)
+    pool.text("b", 1, 1, "bar")
+    pool.begin()
+    assert len(ax.texts) == 0
+    assert pool.text("a", 2, 3, "baz", size=10) is first
+    assert first.get_text() == "baz" and first.get_position() == (2, 3)
+    assert list(ax.texts) == [first]
+    assert pool.text("a", 2, 3, "baz", size=12) is not first
+    plt.close(fig)
+
+
+def test_text_pool_layout_cache():
+    fig, ax = plt.subplots()
+    pool = TextPool(ax)
+    texts._layout_cache.clear()
+    pool.text("a", 0, 0, "1960")
+    fig.canvas.draw()
+    pool.text("a", 0.5, 0.5, "1960")
+    fig.canvas.draw()
+    assert len(texts._layout_cache) == 1
+    plt.close(fig)
+
+
+def test_text_pool_layout_cache_parse_math():
+    fig, ax = plt.subplots()
+    pool = TextPool(ax)
+    texts._layout_cache.clear()
+    plain = pool.text("plain", 0, 0, r"$\alpha^2$", parse_math=False)
+    math = pool.text("math", 0, 0.5, r"$\alpha^2$")
+    fig.canvas.draw()
+    assert len(texts._layout_cache) == 2
+    renderer = fig.canvas.get_renderer()
+    assert (
+        plain.get_window_extent(renderer).width
+        > math.get_window_extent(renderer).width
+    )
+    plt.close(fig)
+
+
+def test_text_pool_public_attach():
+    fig, ax = plt.subplots()
+    pool = TextPool(ax)
+    text = pool.text("a", 0, 0, "foo")
+    annotation = pool.annotate("b", "bar", (0.5, 0.5))
+    pool.begin()
+    assert text.axes is None and len(ax.texts) == 0
+    assert pool.annotate("b", "baz", (0.2, 0.2)) is annotation
+    assert pool.text("a", 1, 1, "qux") is text
+    # attached again in request order, with their clipping unchanged
+    assert list(ax.texts) == [annotation, text]
+    assert annotation.get_clip_box() is None and annotation.get_clip_path() is None
+    assert text.get_clip_box() is not None
+    plt.close(fig)
+
+
+def test_barhplot_pooled_annotations(sample_data1_bardfr):
+    fig, ax = plt.subplots()
+    bar = Barhplot(sample_data1_bardfr)
+    bar.set_time(callback=lambda i, datafier: datafier.data.index[i].year)
+    bar.set_axes(ax)
+    bar.update(0)
+    artists = list(ax.texts)
+    bar.update(1)
+    assert list(ax.texts) == artists
+    plt.close(fig)
@@ -1,4 +1,11 @@
-from pynimate.utils import human_readable
+import numpy as np
+
+from pynimate.utils import (
+    human_readable,
+    human_readable_array,
+    nice_steps,
+    smooth_limits,
+)
 
 
 def test_human_readable():
@@ -11,3 +18,28 @@ def test_human_readable_k():
 
 def test_human_readable_m():
     assert human_readable(5241725, 1) == "5.2M"
+
+
+def test_nice_steps():
+    steps = nice_steps(np.array([5, 12, 90, 0.3]), 6)
+    assert np.allclose(steps, [1, 2.5, 20, 0.1])
+
+
+def test_smooth_limits_contains_data():
+    rng = np.random.default_rng(0)
+    low = rng.random(50).cumsum()
+    high = low + rng.random(50) * 10
+    smooth_low, smooth_high = smooth_limits(low, high, 8)
+    assert np.all(smooth_low <= low) and np.all(smooth_high >= high)
+    assert np.abs(np.diff(smooth_high)).max() <= np.abs(np.diff(high)).max()
+
+
+def test_human_readable_nan():
+    assert human_readable(np.nan) == ""
+
+
+def test_human_readable_array():
+    nums = np.array([20.2333, 21014, 5241725, -999.999, 0, np.nan])
+    expected = [human_readable(num) for num in nums[:-1]] + [""]
+    assert list(human_readable_array(nums)) == expected
+    assert list(human_readable_array(np.array([5, 21014]), 3)) == ["5", "21.014K"]